@@ -0,0 +1,58 @@
+import asyncio
+
+from lispy import vm
+from lispy.interpreter import Interpreter
+
+
+__all__ = ['AsyncInterpreter', 'BudgetExceeded']
+
+
+class BudgetExceeded(RuntimeError):
+    pass
+
+
+class AsyncInterpreter(Interpreter):
+    """Interpreter whose evaluations can share an asyncio event loop.
+
+    Expressions run on the bytecode VM, which keeps its frames on an
+    explicit stack, so an evaluation can be suspended between any two
+    reductions, i.e. calls of lispy functions.  ``interpret_async`` gives
+    control back to the loop every ``slice_reductions`` reductions, which
+    lets other tasks and other evaluations run in between.
+
+    Builtins written in Python, and lispy functions they call back into,
+    run to completion without yielding.
+    """
+
+    def __init__(self, slice_reductions=1000, memo_size=128, cache_size=256):
+        super().__init__('vm', memo_size, cache_size)
+        self.slice_reductions = slice_reductions
+
+    async def interpret_async(self, expr, max_reductions=None, timeout=None):
+        """Evaluate ``expr`` without blocking the event loop.
+
+        Raises ``BudgetExceeded`` once the evaluation takes more than
+        ``max_reductions`` reductions and ``TimeoutError`` once it runs
+        longer than ``timeout`` seconds.  Cancelling the awaiting task
+        abandons the evaluation at its next slice boundary.
+        """
+        execution = vm.Execution(self._cached_code(expr), self.vars_)
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        remaining = max_reductions
+
+        while True:
+            reductions = self.slice_reductions
+            if remaining is not None:
+                reductions = min(reductions, remaining)
+                remaining -= reductions
+            if execution.run(reductions):
+                return execution.value
+
+            if remaining == 0:
+                raise BudgetExceeded(
+                    'Evaluation exceeded {} reductions'.format(max_reductions))
+            if deadline is not None and loop.time() >= deadline:
+                raise TimeoutError(
+                    'Evaluation exceeded {} seconds'.format(timeout))
+            await asyncio.sleep(0)
@@ -0,0 +1,72 @@
+"""Run the benchmark suite or compare two of its reports.
+
+    python -m lispy.bench [--quick] [-k NAME] [-o report.json]
+    python -m lispy.bench compare baseline.json current.json [--threshold 0.1]
+
+``compare`` exits with status 1 if any workload regressed.
+"""
+import argparse
+import json
+import sys
+
+from lispy.bench.suite import WORKLOADS, run, compare
+
+
+def _log(name):
+    print(name, file=sys.stderr)
+
+
+def _run(args):
+    workloads = [workload for workload in WORKLOADS
+                 if (workload.quick or not args.quick)
+                 and all(key in workload.name for key in args.keyword)]
+    report = run(workloads, args.repeat, _log)
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output is None:
+        print(text)
+    else:
+        with open(args.output, 'w') as output:
+            output.write(text + '\n')
+    return 0
+
+
+def _compare(args):
+    with open(args.baseline) as baseline, open(args.current) as current:
+        comparisons = compare(json.load(baseline), json.load(current),
+                              args.threshold)
+
+    print('{:<32} {:>14} {:>14} {:>8}'.format('workload', 'baseline ops/s',
+                                              'current ops/s', 'ratio'))
+    for comparison in comparisons:
+        print('{:<32} {:>14.1f} {:>14.1f} {:>8.3f}{}'.format(
+            comparison.name, comparison.baseline, comparison.current,
+            comparison.ratio, '  REGRESSED' if comparison.regressed else ''))
+    return 1 if any(comparison.regressed for comparison in comparisons) else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m lispy.bench')
+    commands = parser.add_subparsers(dest='command')
+
+    compare_parser = commands.add_parser(
+        'compare', help='compare two reports and flag regressions')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.1,
+                                help='tolerated slowdown, default 0.1')
+    compare_parser.set_defaults(handler=_compare)
+
+    parser.add_argument('--quick', action='store_true',
+                        help='skip the largest workloads')
+    parser.add_argument('-k', '--keyword', action='append', default=[],
+                        help='only run workloads whose name contains this')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('-o', '--output', help='write the report here')
+    parser.set_defaults(handler=_run)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
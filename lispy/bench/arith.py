@@ -0,0 +1,47 @@
+"""Time arithmetic builtins on calls with many operands.
+
+Run with ``python -m lispy.bench.arith``.
+"""
+from time import perf_counter
+
+from lispy.builtins import add, mult
+from lispy.interpreter import Interpreter
+from lispy.parser import Number
+
+
+OPERANDS = 10000
+
+REPEAT = 100
+
+
+def time_builtin(func, args):
+    start = perf_counter()
+    for _ in range(REPEAT):
+        func(args)
+    return (perf_counter() - start) / REPEAT
+
+
+def time_interpret(backend, expr):
+    interpreter = Interpreter(backend=backend)
+    interpreter.interpret(expr)  # compile outside the timings
+    start = perf_counter()
+    for _ in range(REPEAT):
+        interpreter.interpret(expr)
+    return (perf_counter() - start) / REPEAT
+
+
+def main():
+    args = [Number(i) for i in range(OPERANDS)]
+    ones = [Number(1)] * OPERANDS
+    expr = '(+ {})'.format(' '.join(str(i) for i in range(OPERANDS)))
+
+    print('{:<16} {:>12}'.format('call', 'ms/call'))
+    print('{:<16} {:>12.3f}'.format('add', time_builtin(add, args) * 1e3))
+    print('{:<16} {:>12.3f}'.format('mult', time_builtin(mult, ones) * 1e3))
+    for backend in ('closure', 'vm', 'tree'):
+        seconds = time_interpret(backend, expr)
+        print('{:<16} {:>12.3f}'.format('(+ ...) ' + backend, seconds * 1e3))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+"""Show that tokenize scales linearly with the size of its input.
+
+Run with ``python -m lispy.bench.lexer``.
+"""
+from time import perf_counter
+
+from lispy.lexer import tokenize
+
+
+SIZES = [1 << 10, 10 << 10, 100 << 10, 1 << 20, 10 << 20]
+
+FORM = "(define square (func (x) (* x x)))\n(cons 1 '(2 3 abc))\n"
+
+
+def generate_source(size):
+    repeat, remainder = divmod(size, len(FORM))
+    return FORM * repeat + ' ' * remainder
+
+
+def time_tokenize(code):
+    start = perf_counter()
+    for _ in tokenize(code):
+        pass
+    return perf_counter() - start
+
+
+def main():
+    time_tokenize(FORM)  # build the lexer tables outside the timings
+    print('{:>12} {:>10} {:>12}'.format('bytes', 'seconds', 'ns/byte'))
+    for size in SIZES:
+        seconds = time_tokenize(generate_source(size))
+        print('{:>12} {:>10.4f} {:>12.1f}'.format(size, seconds,
+                                                  seconds * 1e9 / size))
+
+
+if __name__ == '__main__':
+    main()
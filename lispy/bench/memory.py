@@ -0,0 +1,54 @@
+"""Measure the memory held by the AST of a large parsed program.
+
+Run with ``python -m lispy.bench.memory``.
+"""
+import tracemalloc
+from time import perf_counter
+
+from lispy.lexer import tokenize
+from lispy.parser import parse_all
+
+
+SIZES = [100 << 10, 1 << 20, 4 << 20]
+
+FORM = ("(define f{0} (func (x y) (cond ((eq? x 0) y)"
+        " (default (f{0} (- x 1) (+ y {0}))))))\n(cons {0} '(1 2 x y))\n")
+
+
+def generate_source(size):
+    forms = []
+    length = 0
+    i = 0
+    while length < size:
+        form = FORM.format(i % 1000)
+        forms.append(form)
+        length += len(form)
+        i += 1
+    return ''.join(forms)
+
+
+def measure_parse(code):
+    """Return ``(seconds, bytes held, peak bytes)`` for parsing ``code``."""
+    tokens = list(tokenize(code))
+    tracemalloc.start()
+    start = perf_counter()
+    asts = list(parse_all(tokens))
+    seconds = perf_counter() - start
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del asts
+    return seconds, held, peak
+
+
+def main():
+    print('{:>12} {:>10} {:>12} {:>12} {:>10}'.format(
+        'bytes', 'seconds', 'held', 'peak', 'held/byte'))
+    for size in SIZES:
+        code = generate_source(size)
+        seconds, held, peak = measure_parse(code)
+        print('{:>12} {:>10.3f} {:>12} {:>12} {:>10.1f}'.format(
+            len(code), seconds, held, peak, held / len(code)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""Measure how InterpreterPool throughput scales with worker processes.
+
+Run with ``python -m lispy.bench.pool``.
+"""
+import os
+from time import perf_counter
+
+from lispy.pool import InterpreterPool
+
+
+PRELOAD = ['(define fib (func (n) (cond ((eq? n 0) 0) ((eq? n 1) 1)'
+           '  (default (+ (fib (- n 1)) (fib (- n 2)))))))']
+
+EXPRS = ['(fib 16)'] * 256
+
+
+def time_pool(processes):
+    with InterpreterPool(processes, preload=PRELOAD) as pool:
+        list(pool.map(EXPRS[:processes]))  # start and warm the workers
+        start = perf_counter()
+        for _ in pool.map(EXPRS, chunksize=8):
+            pass
+        return perf_counter() - start
+
+
+def main():
+    print('{:>9} {:>10} {:>10} {:>9}'.format('processes', 'seconds',
+                                            'exprs/s', 'speedup'))
+    processes = 1
+    baseline = None
+    while processes <= (os.cpu_count() or 1):
+        seconds = time_pool(processes)
+        baseline = baseline or seconds
+        print('{:>9} {:>10.3f} {:>10.1f} {:>9.2f}'.format(
+            processes, seconds, len(EXPRS) / seconds, baseline / seconds))
+        processes *= 2
+
+
+if __name__ == '__main__':
+    main()
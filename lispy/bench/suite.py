@@ -0,0 +1,193 @@
+"""Workloads for every stage of lispy and a runner reporting them as JSON.
+
+Each workload prepares its input up front and returns a function doing
+one measured run together with the number of operations that run counts
+as, e.g. bytes tokenized or expressions evaluated.  Timings are the best
+of ``repeat`` runs; peak memory is taken in one extra run under
+``tracemalloc`` so tracing does not skew the timings.
+"""
+import platform
+import tracemalloc
+from collections import namedtuple
+from time import perf_counter
+
+from lispy import reglang
+from lispy.bench.lexer import generate_source
+from lispy.evaluator import evaluate
+from lispy.interpreter import Interpreter
+from lispy.lexer import tokenize, token_classes
+from lispy.parser import parse
+
+
+__all__ = ['Workload', 'WORKLOADS', 'Comparison', 'run', 'compare']
+
+
+Workload = namedtuple('Workload', 'name phase setup quick')
+
+
+FORMAT_VERSION = 1
+
+FIB = ('(define fib (func (n) (cond ((< n 2) n)'
+       ' (default (+ (fib (- n 1)) (fib (- n 2)))))))')
+
+FACTORIAL = ('(define factorial (func (n acc) (cond ((eq? n 0) acc)'
+             ' (default (factorial (- n 1) (* n acc))))))')
+
+LIST_WALK = ("(define range (func (n acc) (cond ((eq? n 0) acc)"
+             " (default (range (- n 1) (cons n acc))))))"
+             "(define total (func (l acc) (cond ((eq? l '()) acc)"
+             " (default (total (cdr l) (+ acc (car l)))))))")
+
+
+def _reglang_build():
+    fas = [token_class.fa for token_class in token_classes]
+    return lambda: reglang.tagged_dfa(*fas, minimize=True), 1
+
+
+def _reglang_accepts(size):
+    def setup():
+        fa = reglang.Con(reglang.plus(reglang.char_range('a', 'z')),
+                         reglang.KleeneStar(reglang.union_char('0123456789')))
+        dfa = fa.to_dfa(minimize=True)
+        string = 'lispy' * (size // 5) + '42'
+        return lambda: dfa.accepts(string), len(string)
+    return setup
+
+
+def _tokenize(size):
+    def setup():
+        code = generate_source(size)
+        tokenize('()')  # build the lexer tables outside the timings
+
+        def run_():
+            for _ in tokenize(code):
+                pass
+        return run_, size
+    return setup
+
+
+def _parse_deep(depth):
+    def setup():
+        tokens = list(tokenize('(' * depth + 'x' + ')' * depth))
+        return lambda: parse(tokens), len(tokens)
+    return setup
+
+
+def _parse_wide(width):
+    def setup():
+        code = '({})'.format(' '.join('(f x {} (g y))'.format(i)
+                                      for i in range(width)))
+        tokens = list(tokenize(code))
+        return lambda: parse(tokens), len(tokens)
+    return setup
+
+
+def _evaluate(definitions, expr):
+    def setup():
+        interpreter = Interpreter(backend='tree')
+        for _ in interpreter.interpret_many(definitions):
+            pass
+        ast = parse(tokenize(expr))
+        vars_ = interpreter.vars_
+        return lambda: evaluate(ast, vars_), 1
+    return setup
+
+
+def _interpret(backend, cache_size):
+    def setup():
+        interpreter = Interpreter(backend=backend, cache_size=cache_size)
+        interpreter.interpret(FIB)
+        exprs = ['(fib {})'.format(n % 10) for n in range(200)]
+
+        def run_():
+            for expr in exprs:
+                interpreter.interpret(expr)
+        return run_, len(exprs)
+    return setup
+
+
+WORKLOADS = [
+    Workload('reglang.build_lexer_dfa', 'reglang', _reglang_build, True),
+    Workload('reglang.accepts_1mb', 'reglang', _reglang_accepts(1 << 20),
+             True),
+    Workload('lexer.tokenize_1kb', 'lexer', _tokenize(1 << 10), True),
+    Workload('lexer.tokenize_100kb', 'lexer', _tokenize(100 << 10), True),
+    Workload('lexer.tokenize_1mb', 'lexer', _tokenize(1 << 20), False),
+    Workload('lexer.tokenize_10mb', 'lexer', _tokenize(10 << 20), False),
+    Workload('parser.deep_10k', 'parser', _parse_deep(10000), True),
+    Workload('parser.wide_10k', 'parser', _parse_wide(10000), True),
+    Workload('evaluator.fib_15', 'evaluator', _evaluate(FIB, '(fib 15)'),
+             True),
+    Workload('evaluator.factorial_500', 'evaluator',
+             _evaluate(FACTORIAL, '(factorial 500 1)'), True),
+    Workload('evaluator.list_walk_5k', 'evaluator',
+             _evaluate(LIST_WALK, "(total (range 5000 '()) 0)"), True),
+    Workload('interpreter.closure_cached', 'interpreter',
+             _interpret('closure', 256), True),
+    Workload('interpreter.closure_uncached', 'interpreter',
+             _interpret('closure', 0), True),
+    Workload('interpreter.vm_cached', 'interpreter', _interpret('vm', 256),
+             True),
+    Workload('interpreter.tree_cached', 'interpreter',
+             _interpret('tree', 256), True),
+]
+
+
+def run(workloads=WORKLOADS, repeat=3, log=None):
+    """Run ``workloads`` and return the report as a JSON-ready dict."""
+    results = {}
+    phases = {}
+    for workload in workloads:
+        if log is not None:
+            log(workload.name)
+        func, ops = workload.setup()
+        func()  # warm up
+
+        seconds = float('inf')
+        for _ in range(repeat):
+            start = perf_counter()
+            func()
+            seconds = min(seconds, perf_counter() - start)
+
+        tracemalloc.start()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        results[workload.name] = {
+            'phase': workload.phase,
+            'ops': ops,
+            'seconds': seconds,
+            'ops_per_sec': ops / seconds,
+            'peak_bytes': peak,
+        }
+        phases[workload.phase] = phases.get(workload.phase, 0) + seconds
+
+    return {
+        'version': FORMAT_VERSION,
+        'python': platform.python_version(),
+        'repeat': repeat,
+        'phases': phases,
+        'results': results,
+    }
+
+
+Comparison = namedtuple('Comparison', 'name baseline current ratio regressed')
+
+
+def compare(baseline, current, threshold=0.1):
+    """Compare the throughput of workloads found in both reports.
+
+    ``ratio`` is current over baseline operations per second; a workload
+    regressed if it got more than ``threshold`` slower.
+    """
+    comparisons = []
+    for name, result in sorted(current['results'].items()):
+        base = baseline['results'].get(name)
+        if base is None:
+            continue
+        ratio = result['ops_per_sec'] / base['ops_per_sec']
+        comparisons.append(Comparison(name, base['ops_per_sec'],
+                                      result['ops_per_sec'], ratio,
+                                      ratio < 1 - threshold))
+    return comparisons
@@ -1,8 +1,10 @@
-from collections import ChainMap
-from functools import reduce
+import operator
+from collections import OrderedDict, namedtuple
+from math import prod
 
 from lispy.parser import Number, Symbol, List
-from lispy.evaluator import macro, evaluate
+from lispy.evaluator import macro, tail_macro, evaluate, Lambda
+from lispy.vector import Vector
 
 
 def eq(args):
@@ -12,17 +14,21 @@ def eq(args):
 
 def cons(args):
     head, tail = args
-    return List([head] + tail.elements)
+    if not isinstance(tail, List):
+        raise TypeError('cons onto a non-list: {}'.format(tail))
+    return List.cons(head, tail)
 
 
 def car(args):
     list_, = args
-    return list_.elements[0]
+    if list_.is_empty:
+        raise IndexError('car of an empty list')
+    return list_.head
 
 
 def cdr(args):
     list_, = args
-    return List(list_.elements[1:])
+    return list_ if list_.is_empty else list_.tail
 
 
 @macro
@@ -42,40 +48,190 @@ def define(vars_, args):
 @macro
 def func(vars_, args):
     arglist, definition = args
-    arglist = arglist.elements
+    params = [sym.identifier for sym in arglist]
+    return Lambda(params, definition, vars_)
 
-    def f(fargs):
-        locals_ = {sym.identifier: arg for sym, arg in zip(arglist, fargs)}
-        envs = ChainMap(locals_, vars_)
-        return evaluate(definition, envs)
 
-    return f
+def _select_branch(vars_, args):
+    for arg in args:
+        condition, expr = arg
+        if evaluate(condition, vars_):
+            return expr
 
 
-@macro
+@tail_macro(_select_branch)
 def cond(vars_, args):
-    for arg in args:
-        condition, expr = arg.elements
-        if evaluate(condition, vars_):
-            return evaluate(expr, vars_)
+    expr = _select_branch(vars_, args)
+    if expr is not None:
+        return evaluate(expr, vars_)
 
 
 default = True
 
 
 def add(args):
-    return reduce(lambda a, b: Number(a.value + b.value), args, Number(0))
+    return Number(sum([arg.value for arg in args]))
 
 
 def minus(args):
-    a, b = args
-    return Number(a.value - b.value)
+    first, rest = _unpack_variadic('-', args)
+    if not rest:
+        return Number(-first)
+    return Number(first - sum(rest))
 
 
 def mult(args):
-    return reduce(lambda a, b: Number(a.value * b.value), args, Number(1))
+    return Number(prod([arg.value for arg in args]))
 
 
 def div(args):
+    first, rest = _unpack_variadic('/', args)
+    if not rest:
+        return Number(1 / first)
+    return Number(first / prod(rest))
+
+
+def floordiv(args):
+    a, b = args
+    return Number(a.value // b.value)
+
+
+def mod(args):
+    a, b = args
+    return Number(a.value % b.value)
+
+
+def _unpack_variadic(name, args):
+    if not args:
+        raise TypeError('{} expects at least 1 argument'.format(name))
+    values = [arg.value for arg in args]
+    return values[0], values[1:]
+
+
+def _comparison(compare):
+    def comparison(args):
+        values = [arg.value for arg in args]
+        return all(map(compare, values, values[1:]))
+
+    return comparison
+
+
+less = _comparison(operator.lt)
+greater = _comparison(operator.gt)
+less_equal = _comparison(operator.le)
+greater_equal = _comparison(operator.ge)
+
+
+def vector(args):
+    if len(args) == 1 and isinstance(args[0], List):
+        args = args[0]
+    return Vector([arg.value for arg in args])
+
+
+def vref(args):
+    vector_, index = args
+    return Number(vector_[index.value])
+
+
+def vlen(args):
+    vector_, = args
+    return Number(len(vector_))
+
+
+def vadd(args):
+    a, b = args
+    return a.add(_vector_operand(b))
+
+
+def vmul(args):
+    a, b = args
+    return a.mul(_vector_operand(b))
+
+
+def vsum(args):
+    vector_, = args
+    return Number(vector_.sum())
+
+
+def vdot(args):
     a, b = args
-    return Number(a.value / b.value)
+    return Number(a.dot(b))
+
+
+def vslice(args):
+    vector_, *bounds = args
+    return vector_.slice(*[bound.value for bound in bounds])
+
+
+def _vector_operand(arg):
+    return arg if arg.__class__ is Vector else arg.value
+
+
+MemoStats = namedtuple('MemoStats', 'hits misses evictions')
+
+
+class Memoizer:
+    """The ``memoize`` builtin.
+
+    ``(memoize f)`` or ``(memoize f size)`` wraps ``f`` in a ``Memoized``
+    with an LRU cache of at most ``size`` results, ``maxsize`` by default.
+    All functions it wraps count their hits, misses and evictions here.
+    """
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __call__(self, args):
+        func, *size = args
+        maxsize = size[0].value if size else self.maxsize
+        return Memoized(func, maxsize, self)
+
+    @property
+    def stats(self):
+        return MemoStats(self.hits, self.misses, self.evictions)
+
+
+class Memoized:
+    """``func`` with an LRU cache of its results keyed by the arguments.
+
+    ``Number`` arguments are keyed by the type of their value as well, since
+    ``2`` and ``2.0`` are equal but may give results of different types.
+    """
+
+    __slots__ = ('func', 'maxsize', 'cache', 'memoizer')
+
+    def __init__(self, func, maxsize, memoizer):
+        self.func = func
+        self.maxsize = maxsize
+        self.cache = OrderedDict()
+        self.memoizer = memoizer
+
+    def __call__(self, args):
+        key = tuple([_memo_key(arg) for arg in args])
+        cache = self.cache
+        try:
+            value = cache[key]
+        except KeyError:
+            pass
+        else:
+            cache.move_to_end(key)
+            self.memoizer.hits += 1
+            return value
+
+        self.memoizer.misses += 1
+        value = self.func(args)
+        if self.maxsize > 0:
+            cache[key] = value
+            if len(cache) > self.maxsize:
+                cache.popitem(last=False)
+                self.memoizer.evictions += 1
+        return value
+
+
+def _memo_key(arg):
+    if arg.__class__ is Number:
+        return Number, arg.value.__class__, arg.value
+    return arg
@@ -0,0 +1,276 @@
+from contextvars import ContextVar
+
+from lispy import builtins
+from lispy.evaluator import ismacro
+from lispy.parser import List, Quotation, Number, Symbol
+from lispy.resolver import UNBOUND, Scope, global_value, defined_names
+from lispy.vector import Vector
+
+
+__all__ = ['compile_ast', 'Closure']
+
+
+def compile_ast(ast, vars_, profiler=None):
+    """Compile ``ast`` into a closure taking the environment to run in.
+
+    Special forms (``define``, ``func``, ``cond`` and ``atom?``) and other
+    macros are recognised from their bindings in ``vars_`` at compile time,
+    unless a function parameter shadows the name, and their arity is
+    checked once here instead of on every evaluation.  Local variables are
+    resolved to frame slots and globals are read from ``vars_`` directly.
+
+    With a ``lispy.profiler.Profiler``, the bodies of the functions created
+    by the code are instrumented to record their calls in it.
+    """
+    token = _profiler.set(profiler)
+    try:
+        return _compile(ast, vars_, None, False)
+    finally:
+        _profiler.reset(token)
+
+
+_profiler = ContextVar('profiler', default=None)
+
+
+class Closure:
+    """Compiled function created by ``func``.
+
+    Calls in tail position of its body return a ``_TailCall`` instead of
+    recursing, and ``__call__`` keeps running them in a loop.
+    """
+
+    __slots__ = ('arity', 'body', 'frame_tail')
+
+    def __init__(self, scope, body, env):
+        self.arity = len(scope.params)
+        self.body = body
+        self.frame_tail = scope.frame_tail(env)
+
+    def bind(self, args):
+        if len(args) != self.arity:
+            raise TypeError('function expects {} arguments, got {}'.format(
+                self.arity, len(args)))
+        return args + self.frame_tail
+
+    def __call__(self, args):
+        result = self.body(self.bind(args))
+        while result.__class__ is _TailCall:
+            func = result.func
+            result = func.body(func.bind(result.args))
+        return result
+
+
+class _TailCall:
+    __slots__ = ('func', 'args')
+
+    def __init__(self, func, args):
+        self.func = func
+        self.args = args
+
+
+def _compile(ast, vars_, scope, tail):
+    if isinstance(ast, List):
+        return _compile_list(ast, vars_, scope, tail)
+    compiler = _compilers[ast.__class__]
+    return compiler(ast, vars_, scope)
+
+
+def _compile_constant(value, vars_, scope):
+    return lambda env: value
+
+
+def _compile_symbol(symbol, vars_, scope):
+    identifier = symbol.identifier
+    resolved = scope.resolve(identifier) if scope is not None else None
+
+    if resolved is None:
+        def load(env):
+            return vars_[identifier]
+        return load
+
+    depth, index, is_param = resolved
+    if not is_param:
+        defining = scope.enclosing(depth)
+
+        def load(env):
+            for _ in range(depth):
+                env = env[-1]
+            value = env[index]
+            if value is UNBOUND:
+                return defining.lookup(env, identifier, vars_)
+            return value
+    elif depth == 0:
+        def load(env):
+            return env[index]
+    elif depth == 1:
+        def load(env):
+            return env[-1][index]
+    else:
+        def load(env):
+            for _ in range(depth):
+                env = env[-1]
+            return env[index]
+
+    return load
+
+
+def _compile_quotation(quotation, vars_, scope):
+    expr = quotation.expr
+    return lambda env: expr
+
+
+def _compile_list(list_, vars_, scope, tail):
+    head = list_.head
+    args = list_.tail
+
+    funcobj = global_value(head, vars_, scope)
+    if ismacro(funcobj):
+        special = _special_forms.get(funcobj)
+        if special is not None:
+            return special(args, vars_, scope, tail)
+        return _compile_macro(funcobj, args, vars_, scope)
+
+    func = _compile(head, vars_, scope, False)
+    args = [_compile(arg, vars_, scope, False) for arg in args]
+    if tail:
+        return _compile_tail_call(func, args)
+    return _compile_call(func, args)
+
+
+def _compile_macro(macro, args, vars_, scope):
+    if scope is None:
+        def expand(env):
+            return macro(vars_, args)
+    else:
+        def expand(env):
+            return macro(scope.mapping(env, vars_), args)
+
+    return expand
+
+
+def _compile_call(func, args):
+    if not args:
+        def call(env):
+            return func(env)([])
+    elif len(args) == 1:
+        arg, = args
+
+        def call(env):
+            return func(env)([arg(env)])
+    elif len(args) == 2:
+        arg1, arg2 = args
+
+        def call(env):
+            return func(env)([arg1(env), arg2(env)])
+    else:
+        def call(env):
+            return func(env)([arg(env) for arg in args])
+
+    return call
+
+
+def _compile_tail_call(func, args):
+    def call(env):
+        funcobj = func(env)
+        fargs = [arg(env) for arg in args]
+        if funcobj.__class__ is Closure:
+            return _TailCall(funcobj, fargs)
+        return funcobj(fargs)
+
+    return call
+
+
+def _compile_define(args, vars_, scope, tail):
+    name, ast = unpack_form('define', args, 2)
+    if name.__class__ is not Symbol:
+        raise SyntaxError('define expects a symbol, got: {}'.format(name))
+
+    identifier = name.identifier
+    if (isinstance(ast, List) and
+            global_value(ast.head, vars_, scope) is builtins.func):
+        value = _compile_func(ast.tail, vars_, scope, False, identifier)
+    else:
+        value = _compile(ast, vars_, scope, False)
+
+    if scope is None:
+        def define(env):
+            vars_[identifier] = value(env)
+    else:
+        index = scope.indices[identifier]
+
+        def define(env):
+            env[index] = value(env)
+
+    return define
+
+
+def _compile_func(args, vars_, scope, tail, name='<func>'):
+    arglist, definition = unpack_form('func', args, 2)
+    params = func_params(arglist)
+    func_scope = Scope(params, defined_names(definition, params, vars_, scope),
+                       scope)
+    body = _compile(definition, vars_, func_scope, True)
+    profiler = _profiler.get()
+    if profiler is not None:
+        body = profiler.instrument(name, body)
+
+    def func(env):
+        return Closure(func_scope, body, env)
+
+    return func
+
+
+def _compile_cond(args, vars_, scope, tail):
+    clauses = []
+    for arg in args:
+        condition, expr = unpack_form('cond clause', arg, 2)
+        clauses.append((_compile(condition, vars_, scope, False),
+                        _compile(expr, vars_, scope, tail)))
+
+    def cond(env):
+        for condition, expr in clauses:
+            if condition(env):
+                return expr(env)
+
+    return cond
+
+
+def _compile_atom(args, vars_, scope, tail):
+    arg, = unpack_form('atom?', args, 1)
+    is_atom = arg.__class__ in (Number, Symbol)
+    return lambda env: is_atom
+
+
+def func_params(arglist):
+    if not isinstance(arglist, List) or any(arg.__class__ is not Symbol
+                                            for arg in arglist):
+        raise SyntaxError('func expects a list of symbols, got: {}'.format(
+            arglist))
+    return [sym.identifier for sym in arglist]
+
+
+def unpack_form(form, args, count):
+    if not isinstance(args, List):
+        raise SyntaxError('{} expects a list, got: {}'.format(form, args))
+
+    elements = args.elements
+    if len(elements) != count:
+        raise SyntaxError('{} expects {} arguments, got {}'.format(
+            form, count, len(elements)))
+    return elements
+
+
+_compilers = {
+    Number: _compile_constant,
+    Vector: _compile_constant,
+    Symbol: _compile_symbol,
+    Quotation: _compile_quotation,
+}
+
+
+_special_forms = {
+    builtins.define: _compile_define,
+    builtins.func: _compile_func,
+    builtins.cond: _compile_cond,
+    builtins.atom: _compile_atom,
+}
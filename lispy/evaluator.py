@@ -1,10 +1,37 @@
-from lispy.parser import List, Quotation, Number, Symbol
+from collections import ChainMap
 
+from lispy.parser import List, Quotation, Number, Symbol, _SourceList
+from lispy.vector import Vector
 
-__all__ = ['evaluate', 'macro']
+
+__all__ = ['evaluate', 'macro', 'tail_macro', 'Lambda']
 
 
 def evaluate(ast, vars_):
+    """Evaluate ``ast`` in ``vars_``.
+
+    Calls of ``Lambda`` functions and the expressions chosen by tail
+    macros are evaluated by looping here rather than recursing, so tail
+    calls run in constant Python stack.
+    """
+    while ast.__class__ in _list_classes:
+        funcobj = evaluate(ast.head, vars_)
+        args = ast.tail
+
+        if ismacro(funcobj):
+            select = getattr(funcobj, '_tail', None)
+            if select is None:
+                return funcobj(vars_, args)
+            ast = select(vars_, args)
+            if ast is None:
+                return None
+        else:
+            argobjs = [evaluate(arg, vars_) for arg in args]
+            if funcobj.__class__ is not Lambda:
+                return funcobj(argobjs)
+            ast = funcobj.body
+            vars_ = funcobj.bind(argobjs)
+
     evaluator = _evaluators[ast.__class__]
     return evaluator(ast, vars_)
 
@@ -14,12 +41,43 @@ def macro(func):
     return func
 
 
+def tail_macro(select):
+    """Mark a macro as evaluating the expression ``select`` picks.
+
+    ``select(vars_, args)`` returns the AST the macro evaluates as its
+    result, or ``None`` for no value, which lets ``evaluate`` continue with
+    it in tail position.
+    """
+    def decorator(func):
+        func._tail = select
+        return macro(func)
+
+    return decorator
+
+
+class Lambda:
+    """Function created by ``func``, evaluated by ``evaluate``'s loop."""
+
+    __slots__ = ('params', 'body', 'env')
+
+    def __init__(self, params, body, env):
+        self.params = params
+        self.body = body
+        self.env = env
+
+    def bind(self, args):
+        return ChainMap(dict(zip(self.params, args)), self.env)
+
+    def __call__(self, args):
+        return evaluate(self.body, self.bind(args))
+
+
 def ismacro(func):
     return getattr(func, '_is_macro', False)
 
 
-def _eval_number(number, vars_):
-    return number
+def _eval_constant(value, vars_):
+    return value
 
 
 def _eval_symbol(symbol, vars_):
@@ -30,19 +88,12 @@ def _eval_quotation(quotation, vars_):
     return quotation.expr
 
 
-def _eval_list(list_, vars_):
-    func, *args = list_.elements
-    funcobj = evaluate(func, vars_)
-    if ismacro(funcobj):
-        return funcobj(vars_, args)
-    else:
-        argobjs = [evaluate(arg, vars_) for arg in args]
-        return funcobj(argobjs)
+_list_classes = (List, _SourceList)
 
 
 _evaluators = {
-    Number: _eval_number,
+    Number: _eval_constant,
+    Vector: _eval_constant,
     Symbol: _eval_symbol,
     Quotation: _eval_quotation,
-    List: _eval_list
 }
@@ -1,12 +1,80 @@
+import sys
+from array import array
+from collections import OrderedDict, deque, namedtuple
+from functools import partial
+
+from lispy import vm
 from lispy.builtins import (eq, cons, car, cdr, atom, define, func, cond,
-                            add, minus, mult, div, default)
+                            add, minus, mult, div, floordiv, mod, less,
+                            greater, less_equal, greater_equal, vector, vref,
+                            vlen, vadd, vmul, vsum, vdot, vslice, default,
+                            Memoizer)
+from lispy.compiler import compile_ast
 from lispy.evaluator import evaluate
-from lispy.lexer import tokenize
-from lispy.parser import parse
+from lispy.lexer import tokenize, tokenize_stream
+from lispy.parser import parse, parse_all
+from lispy.profiler import Profiler
+from lispy.resolver import recording_globals
+
+
+def _compile_tree(ast, vars_):
+    return lambda env: evaluate(ast, env)
+
+
+_backends = {
+    'closure': compile_ast,
+    'tree': _compile_tree,
+    'vm': vm.compile_ast,
+}
+
+
+CacheStats = namedtuple('CacheStats', 'hits misses evictions size bytes')
 
 
 class Interpreter:
-    def __init__(self):
+    """Read and evaluate lispy expressions in a persistent environment.
+
+    ``backend`` selects how parsed expressions are run: ``'closure'``
+    compiles them to nested Python closures first, ``'vm'`` to bytecode for
+    the stack machine in ``lispy.vm``, and ``'tree'`` walks the AST with
+    ``evaluate``.
+
+    ``memo_size`` is the default cache size of functions wrapped with
+    ``memoize``; ``memo_stats`` counts their cache hits and misses.
+
+    The compiled form of the last ``cache_size`` distinct source strings is
+    kept, so interpreting the same text again skips lexing, parsing and
+    compiling; ``cache_size=0`` disables this.  Compiled code depends on the
+    globals the compiler looked up, such as special forms and arithmetic
+    builtins, so an entry is compiled again once any of them is rebound.
+    ``cache_stats`` reports the cache hits, misses, evictions, entries and
+    bytes of source held.
+
+    With ``profile=True`` the closure backend instruments the functions it
+    compiles, and ``profiler`` records their calls; see ``lispy.profiler``.
+    Otherwise ``profiler`` is ``None`` and no instrumentation is compiled.
+    """
+
+    def __init__(self, backend='closure', memo_size=128, cache_size=256,
+                 profile=False):
+        if backend not in _backends:
+            raise ValueError('Unknown backend: {}'.format(backend))
+        if profile and backend != 'closure':
+            raise ValueError('Profiling needs the closure backend')
+
+        self.backend = backend
+        self._compile = _backends[backend]
+        self.profiler = None
+        if profile:
+            self.profiler = Profiler()
+            self._compile = partial(compile_ast, profiler=self.profiler)
+        self._memoizer = Memoizer(memo_size)
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._cache_hits = 0
+        self._cache_misses = 0
+        self._cache_evictions = 0
+        self._cache_bytes = 0
         self.vars_ = {
             'eq?': eq,
             'cons': cons,
@@ -20,11 +88,107 @@ class Interpreter:
             '+': add,
             '-': minus,
             '*': mult,
-            '/': div
+            '/': div,
+            '//': floordiv,
+            'mod': mod,
+            '<': less,
+            '>': greater,
+            '<=': less_equal,
+            '>=': greater_equal,
+            'vector': vector,
+            'vref': vref,
+            'vlen': vlen,
+            'vmap+': vadd,
+            'v*': vmul,
+            'vsum': vsum,
+            'vdot': vdot,
+            'vslice': vslice,
+            'memoize': self._memoizer
         }
 
+    @property
+    def memo_stats(self):
+        return self._memoizer.stats
+
+    @property
+    def cache_stats(self):
+        return CacheStats(self._cache_hits, self._cache_misses,
+                          self._cache_evictions, len(self._cache),
+                          self._cache_bytes)
+
+    def clear_cache(self):
+        self._cache.clear()
+        self._cache_bytes = 0
+
     def interpret(self, expr):
-        tokens = tokenize(expr)
-        ast = parse(tokens)
-        value = evaluate(ast, self.vars_)
+        code = self._cached_code(expr)
+        value = code(self.vars_)
         return value
+
+    def interpret_many(self, code):
+        """Evaluate the top-level forms of ``code`` in order.
+
+        Returns an iterator of their values; each form is parsed and
+        evaluated only when the iterator reaches it.
+        """
+        offsets = array('I')
+        return self._interpret_all(tokenize(code, offsets), offsets, code)
+
+    def interpret_file(self, file, chunk_size=8192):
+        """Like ``interpret_many`` for a path or text file object.
+
+        The file is read in chunks of ``chunk_size`` characters as the
+        returned iterator advances, so syntax errors are reported by their
+        offset into the file.
+        """
+        offsets = deque()
+        if hasattr(file, 'read'):
+            yield from self._interpret_all(
+                tokenize_stream(file, chunk_size, offsets), offsets)
+        else:
+            with open(file) as stream:
+                yield from self._interpret_all(
+                    tokenize_stream(stream, chunk_size, offsets), offsets)
+
+    def evaluate(self, ast):
+        """Compile and evaluate an already parsed expression."""
+        code = self._compile(ast, self.vars_)
+        return code(self.vars_)
+
+    def _interpret_all(self, tokens, offsets=None, source=None):
+        for ast in parse_all(tokens, offsets, source):
+            yield self.evaluate(ast)
+
+    def _cached_code(self, expr):
+        if self.cache_size <= 0:
+            return self._compile_source(expr)
+
+        cache = self._cache
+        entry = cache.get(expr)
+        if entry is not None:
+            code, bindings = entry
+            vars_ = self.vars_
+            if all(vars_.get(name) is value
+                   for name, value in bindings.items()):
+                cache.move_to_end(expr)
+                self._cache_hits += 1
+                return code
+            del cache[expr]
+            self._cache_bytes -= sys.getsizeof(expr)
+
+        self._cache_misses += 1
+        with recording_globals() as bindings:
+            code = self._compile_source(expr)
+        cache[expr] = code, bindings
+        self._cache_bytes += sys.getsizeof(expr)
+        while len(cache) > self.cache_size:
+            evicted, _ = cache.popitem(last=False)
+            self._cache_bytes -= sys.getsizeof(evicted)
+            self._cache_evictions += 1
+        return code
+
+    def _compile_source(self, expr):
+        offsets = array('I')
+        tokens = tokenize(expr, offsets)
+        ast = parse(tokens, offsets, expr)
+        return self._compile(ast, self.vars_)
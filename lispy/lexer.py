@@ -1,6 +1,10 @@
-from collections import deque
+from array import array
+from bisect import bisect_right
+from functools import partial
+from itertools import chain
 
-from .reglang import Single, Union, Con, KleeneStar, char_range, union_char
+from .reglang import (Single, Union, Con, KleeneStar, DEAD, REJECT,
+                      char_range, union_char, tagged_dfa)
 
 
 __all__ = ['number',
@@ -9,13 +13,27 @@ __all__ = ['number',
            'open_parenthesis',
            'close_parenthesis',
            'token_classes',
-           'tokenize']
+           'tokenize',
+           'tokenize_stream',
+           'LineIndex']
 
 
 class TokenClass:
+    """Class of tokens matched by the automaton ``fa``.
+
+    ``fa`` may also be a function returning the automaton, which is then
+    built the first time it is used rather than at import time.
+    """
+
     def __init__(self, name, fa):
         self.name = name
-        self.fa = fa
+        self._fa = fa
+
+    @property
+    def fa(self):
+        if callable(self._fa):
+            self._fa = self._fa()
+        return self._fa
 
     def __eq__(self, other):
         return self.name == other.name
@@ -30,56 +48,169 @@ class TokenClass:
         return self.name
 
 
-digit = char_range('0', '9')
-alphabet = Union(char_range('a', 'z'),
+def _digit():
+    return char_range('0', '9')
+
+
+def _alphabet():
+    return Union(char_range('a', 'z'),
                  char_range('A', 'Z'),
-                 union_char('?_+-*/'))
+                 union_char('?_+-*/<>='))
+
 
-number = TokenClass('number', KleeneStar(digit))
-symbol = TokenClass('symbol',
-                    Con(alphabet, KleeneStar(Union(digit, alphabet))))
+number = TokenClass('number', lambda: KleeneStar(_digit()))
+symbol = TokenClass('symbol', lambda: Con(
+    _alphabet(), KleeneStar(Union(_digit(), _alphabet()))))
 quote = TokenClass('quote', Single("'"))
 open_parenthesis = TokenClass('open_parenthesis', Single('('))
 close_parenthesis = TokenClass('close_parenthesis', Single(')'))
-whitespace = TokenClass('whitespace', KleeneStar(union_char(' \t\n')))
+whitespace = TokenClass('whitespace',
+                        lambda: KleeneStar(union_char(' \t\n')))
 
 
 token_classes = [number, symbol, quote, open_parenthesis,
                  close_parenthesis, whitespace]
 
 
-def tokenize(code):
-    while code:
-        accept = _find_next_token(code)
+def tokenize(code, offsets=None):
+    """Yield ``(token_cls, token)`` pairs for ``code``.
 
-        if accept is None:
-            raise ValueError()
-        else:
-            i, token_cls = accept
-            token = code[:i]
-            code = code[i:]
-            if token_cls != whitespace:
-                yield token_cls, token
+    If ``offsets`` is given, usually an ``array('I')``, the start offset of
+    each token is appended to it before the token is yielded.  Invalid
+    input raises ``ValueError`` giving its line and column.
+    """
+    return _tokenize_chunks((code,), offsets, code)
 
 
-def _find_next_token(code):
-    token_cls_states = [(token_class, token_class.fa.start_state)
-                        for token_class in token_classes]
-    accept = None
+def tokenize_stream(stream, chunk_size=8192, offsets=None):
+    """Tokenize a text stream or an iterable of string chunks.
 
-    for i, char in enumerate(code, 1):
-        next_token_cls_states = deque()
+    Tokens may span chunk boundaries; only the unfinished token and the
+    current chunk are held in memory.  The tokens are the same as
+    ``tokenize`` yields for the concatenated input, and ``offsets`` and
+    the offsets reported for invalid input are counted from the start of
+    the stream.
+    """
+    read = getattr(stream, 'read', None)
+    if read is not None:
+        stream = iter(partial(read, chunk_size), '')
+    return _tokenize_chunks(stream, offsets)
 
-        for token_cls, state in token_cls_states:
-            next_state = token_cls.fa.next(state, char)
-            if next_state is not None:
-                next_token_cls_states.append((token_cls, next_state))
-                if next_state.is_final:
-                    accept = (i, token_cls)
 
-        if next_token_cls_states:
-            token_cls_states = next_token_cls_states
-        else:
-            break
+class LineIndex:
+    """Translate offsets into ``code`` to 1-based ``(line, column)`` pairs.
+
+    Only the offset of each line start is kept, so positions are computed
+    on demand instead of being stored on every token.
+    """
+
+    def __init__(self, code):
+        self.line_starts = array('I', [0])
+        newline = code.find('\n')
+        while newline != -1:
+            self.line_starts.append(newline + 1)
+            newline = code.find('\n', newline + 1)
+
+    def position(self, offset):
+        line = bisect_right(self.line_starts, offset)
+        return line, offset - self.line_starts[line - 1] + 1
+
+
+def _tokenize_chunks(chunks, offsets=None, source=None):
+    start_state = _lexer_dfa().start_state
+    code = ''
+    base = 0
+    start = 0
+    i = 0
+    state = start_state
+    accept = None
 
-    return accept
+    for chunk in chain(chunks, [None]):
+        if chunk is not None:
+            code = code[start:] + chunk
+            base += start
+            i -= start
+            if accept is not None:
+                accept = (accept[0] - start, accept[1])
+            start = 0
+
+        while True:
+            i, state, accept = _scan(code, i, state, accept)
+            if state != DEAD and chunk is not None:
+                break
+            if start == len(code):
+                break
+
+            if accept is None:
+                offset = base + start
+                if source is None:
+                    location = 'offset {}'.format(offset)
+                else:
+                    location = 'line {}, column {}'.format(
+                        *LineIndex(source).position(offset))
+                raise ValueError('Invalid token at ' + location)
+            else:
+                stop, tag = accept
+                token_cls = token_classes[tag]
+                if token_cls != whitespace:
+                    if offsets is not None:
+                        offsets.append(base + start)
+                    yield token_cls, code[start:stop]
+                start = i = stop
+                state = start_state
+                accept = None
+
+
+_dfa = None
+
+
+def build_dfa():
+    """Combined automaton over all token classes.
+
+    Final states are tagged with the index of the first token class in
+    ``token_classes`` accepting there, which breaks ties by priority.
+    """
+    return tagged_dfa(*(token_cls.fa for token_cls in token_classes),
+                      minimize=True)
+
+
+def _lexer_dfa():
+    """The lexer DFA, loaded from ``lispy.tables`` or built on first use."""
+    global _dfa
+    if _dfa is None:
+        from lispy import tables
+        _dfa = tables.load()
+        if _dfa is None:
+            _dfa = build_dfa()
+    return _dfa
+
+
+def _scan(code, i, state, accept):
+    """Advance ``state`` over ``code`` from index ``i``.
+
+    Stops at the first character without a transition, returning its index
+    and ``DEAD``, or at the end of ``code`` with the state still alive.
+    ``accept`` is updated to the ``(stop, tag)`` of the longest match.
+    """
+    dfa = _lexer_dfa()
+    columns = dfa.columns
+    table = dfa.table
+    tags = dfa.tags
+    width = dfa.width
+    end = len(code)
+
+    while i < end:
+        column = columns.get(code[i])
+        if column is None:
+            return i, DEAD, accept
+
+        state = table[state * width + column]
+        if state == DEAD:
+            return i, DEAD, accept
+
+        i += 1
+        tag = tags[state]
+        if tag != REJECT:
+            accept = (i, tag)
+
+    return i, state, accept
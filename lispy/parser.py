@@ -1,35 +1,205 @@
-from collections import namedtuple
+import sys
+from collections import deque
+from weakref import WeakValueDictionary
 
-from .lexer import number, symbol, quote, open_parenthesis, close_parenthesis
+from .lexer import (number, symbol, quote, open_parenthesis,
+                    close_parenthesis, LineIndex)
 
 
-__all__ = ['List', 'Quotation', 'Number', 'Symbol', 'parse']
+__all__ = ['List', 'Quotation', 'Number', 'Symbol', 'parse', 'parse_all']
 
 
-class List(namedtuple('List', 'elements')):
+class List:
+    """Persistent singly linked list of cons cells.
+
+    A cell holds ``head`` and the rest of the list in ``tail``; the empty
+    list is any cell whose ``tail`` is ``None``.  Cells are never mutated,
+    so ``cons`` and ``tail`` share structure instead of copying.
+    """
+
+    __slots__ = ('head', 'tail')
+
+    offset = None
+    end = None
+
+    def __new__(cls, elements=()):
+        if not isinstance(elements, (list, tuple)):
+            elements = list(elements)
+
+        list_ = _EMPTY
+        for element in reversed(elements):
+            list_ = List.cons(element, list_)
+
+        if cls is not List:
+            list_ = cls.cons(list_.head, list_.tail)
+        return list_
+
+    @classmethod
+    def cons(cls, head, tail):
+        cell = object.__new__(cls)
+        cell.head = head
+        cell.tail = tail
+        return cell
+
+    @property
+    def is_empty(self):
+        return self.tail is None
+
+    @property
+    def elements(self):
+        return list(self)
+
+    def __iter__(self):
+        cell = self
+        while cell.tail is not None:
+            yield cell.head
+            cell = cell.tail
+
+    def __eq__(self, other):
+        if not isinstance(other, List):
+            return NotImplemented
+
+        cell, other_cell = self, other
+        while cell is not other_cell:
+            if cell.tail is None or other_cell.tail is None:
+                return cell.tail is other_cell.tail
+            if cell.head != other_cell.head:
+                return False
+            cell, other_cell = cell.tail, other_cell.tail
+
+        return True
+
+    def __hash__(self):
+        return hash(tuple(self))
+
+    def __reduce__(self):
+        return List, (self.elements,)
+
+    def __repr__(self):
+        return 'List({!r})'.format(self.elements)
+
     def __str__(self):
-        return '({})'.format(' '.join(str(elem) for elem in self.elements))
+        return '({})'.format(' '.join(str(elem) for elem in self))
+
+
+_EMPTY = List.cons(None, None)
+
+
+class _SourceList(List):
+    """List parsed from source, carrying the span of its parentheses."""
+
+    __slots__ = ('offset', 'end')
+
 
+class Quotation:
+    __slots__ = ('expr', 'offset', 'end')
+
+    def __init__(self, expr):
+        self.expr = expr
+        self.offset = None
+        self.end = None
+
+    def __eq__(self, other):
+        if other.__class__ is not Quotation:
+            return NotImplemented
+        return self.expr == other.expr
+
+    def __hash__(self):
+        return hash((Quotation, self.expr))
+
+    def __reduce__(self):
+        return Quotation, (self.expr,)
+
+    def __repr__(self):
+        return 'Quotation(expr={!r})'.format(self.expr)
 
-class Quotation(namedtuple('Quotation', 'expr')):
     def __str__(self):
         return "'" + str(self.expr)
 
 
-class Number(namedtuple('Number', 'value')):
+class Number:
+    """Numeric literal or value.
+
+    Integers from ``-5`` to ``256`` are shared, like CPython's, so common
+    constants and loop counters need no new objects.
+    """
+
+    __slots__ = ('value',)
+
+    def __new__(cls, value):
+        if value.__class__ is int and -5 <= value <= 256:
+            return _small_numbers[value + 5]
+        number = object.__new__(cls)
+        number.value = value
+        return number
+
+    def __eq__(self, other):
+        if other.__class__ is not Number:
+            return NotImplemented
+        return self.value == other.value
+
+    def __hash__(self):
+        return hash(self.value)
+
+    def __reduce__(self):
+        return Number, (self.value,)
+
+    def __repr__(self):
+        return 'Number(value={!r})'.format(self.value)
+
     def __str__(self):
         return str(self.value)
 
 
-class Symbol(namedtuple('Symbol', 'identifier')):
+def _small_number(value):
+    number = object.__new__(Number)
+    number.value = value
+    return number
+
+
+_small_numbers = [_small_number(value) for value in range(-5, 257)]
+
+
+class Symbol:
+    """Identifier, interned so each name has exactly one ``Symbol``.
+
+    Symbols compare and hash by identity; their ``identifier`` strings are
+    interned as well, which speeds up looking them up in environments.
+    """
+
+    __slots__ = ('identifier', '__weakref__')
+
+    def __new__(cls, identifier):
+        symbol = _symbols.get(identifier)
+        if symbol is None:
+            symbol = object.__new__(cls)
+            symbol.identifier = sys.intern(identifier)
+            _symbols[symbol.identifier] = symbol
+        return symbol
+
+    def __reduce__(self):
+        return Symbol, (self.identifier,)
+
+    def __repr__(self):
+        return 'Symbol(identifier={!r})'.format(self.identifier)
+
     def __str__(self):
         return str(self.identifier)
 
 
-def parse(tokens):
-    token_iter = iter(tokens)
-    expr = [_parse_next(token_cls, token, token_iter)
-            for token_cls, token in token_iter]
+_symbols = WeakValueDictionary()
+
+
+def parse(tokens, offsets=None, source=None):
+    """Parse a single expression from ``tokens``.
+
+    ``offsets`` holds the start offset of each token as filled in by
+    ``tokenize``.  When given, ``List`` and ``Quotation`` nodes get the
+    ``offset`` and ``end`` of their source span and syntax errors report
+    where they happened: as a line and column of ``source`` if the source
+    text is given too, else as an offset.
+    """
+    expr = list(parse_all(tokens, offsets, source))
 
     if len(expr) > 1:
         raise SyntaxError('Multiple expressions but not wrapped in list')
@@ -37,44 +207,110 @@ def parse(tokens):
     return expr[0]
 
 
-def _parse_number(token, tail):
-    return Number(int(token))
+def parse_all(tokens, offsets=None, source=None):
+    """Yield each top-level expression in ``tokens`` once it is complete.
+
+    Tokens are consumed lazily, so a stream of forms is parsed one form at
+    a time.  ``offsets`` may also be a ``collections.deque`` being filled
+    by the lexer; each offset is then popped as its token is consumed, so
+    offsets are not kept for the whole stream.
+    """
+    token_iter = _with_offsets(tokens, offsets)
+    for token_cls, token, offset in token_iter:
+        yield _parse_expr(token_cls, token, offset, token_iter, source)
+
+
+def _with_offsets(tokens, offsets):
+    if offsets is None:
+        for token_cls, token in tokens:
+            yield token_cls, token, None
+    elif isinstance(offsets, deque):
+        for token_cls, token in tokens:
+            yield token_cls, token, offsets.popleft()
+    else:
+        for i, (token_cls, token) in enumerate(tokens):
+            yield token_cls, token, offsets[i]
+
+
+def _error(message, offset, source):
+    if offset is None:
+        return SyntaxError(message)
+    if source is None:
+        return SyntaxError('{} at offset {}'.format(message, offset))
+
+    index = LineIndex(source)
+    line, column = index.position(offset)
+    start = index.line_starts[line - 1]
+    end = source.find('\n', start)
+    text = source[start:] if end == -1 else source[start:end]
+    return SyntaxError(
+        '{} at line {}, column {}'.format(message, line, column),
+        (None, line, column, text))
 
 
-def _parse_symbol(token, tail):
-    return Symbol(token)
+def _parse_expr(token_cls, token, offset, tail, source=None):
+    """Parse the expression starting with the given token.
 
+    Nesting is tracked on an explicit stack rather than by recursion, so
+    the depth of the input is only limited by memory.  Every entry is
+    ``[elements, offset]`` for an open list, or ``[None, offset]`` for a
+    quote still waiting for its expression.
+    """
+    stack = []
 
-def _parse_quotation(token, tail):
-    token_cls, token = next(tail)
-    expr = _parse_next(token_cls, token, tail)
-    return Quotation(expr)
+    while True:
+        if token_cls is open_parenthesis:
+            stack.append([[], offset])
+        elif token_cls is quote:
+            stack.append([None, offset])
+        else:
+            if token_cls is number:
+                expr = Number(int(token))
+            elif token_cls is symbol:
+                expr = Symbol(token)
+            elif (token_cls is close_parenthesis and stack
+                  and stack[-1][0] is not None):
+                elements, start = stack.pop()
+                expr = _make_list(elements, start, offset)
+            else:
+                raise _error('Encounter unexpected token: {}'.format(token),
+                             offset, source)
 
+            while stack and stack[-1][0] is None:
+                _, start = stack.pop()
+                expr = _make_quotation(expr, start, token, offset)
 
-def _parse_list(token, tail):
-    elements = []
+            if not stack:
+                return expr
+            stack[-1][0].append(expr)
 
-    for token_cls, token in tail:
-        if token_cls == close_parenthesis:
+        for token_cls, token, offset in tail:
             break
-        expr = _parse_next(token_cls, token, tail)
-        elements.append(expr)
-    else:
-        raise SyntaxError('Unmatched open parenthesis')
+        else:
+            elements, start = stack[-1]
+            if elements is None:
+                raise _error('Quote without expression', start, source)
+            raise _error('Unmatched open parenthesis', start, source)
+
+
+def _make_quotation(expr, offset, token, token_offset):
+    quotation = Quotation(expr)
+    if offset is not None:
+        quotation.offset = offset
+        quotation.end = _end(expr, token, token_offset)
+    return quotation
 
-    return List(elements)
 
+def _make_list(elements, offset, close_offset):
+    if offset is None:
+        return List(elements)
 
-_parsers = {
-    number: _parse_number,
-    symbol: _parse_symbol,
-    quote: _parse_quotation,
-    open_parenthesis: _parse_list
-}
+    list_ = _SourceList(elements)
+    list_.offset = offset
+    list_.end = close_offset + 1
+    return list_
 
 
-def _parse_next(token_cls, token, tail):
-    parser = _parsers.get(token_cls)
-    if not parser:
-        raise SyntaxError('Encounter unexpected token: {}'.format(token))
-    return parser(token, tail)
+def _end(expr, token, offset):
+    end = getattr(expr, 'end', None)
+    return end if end is not None else offset + len(token)
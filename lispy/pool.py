@@ -0,0 +1,77 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import islice
+
+from lispy.interpreter import Interpreter
+
+
+__all__ = ['InterpreterPool']
+
+
+class InterpreterPool:
+    """Evaluate independent expressions in a pool of worker processes.
+
+    Every worker keeps one warm ``Interpreter`` for its lifetime, created
+    with ``backend`` and primed by running the source strings in
+    ``preload``, e.g. shared definitions.  Expressions are given as source
+    strings or parsed ASTs and are shipped to the workers ``chunksize`` at
+    a time; their values must be picklable.
+    """
+
+    def __init__(self, processes=None, preload=(), backend='closure'):
+        self._executor = ProcessPoolExecutor(
+            max_workers=processes,
+            initializer=_init_worker,
+            initargs=(backend, tuple(preload)))
+
+    def map(self, exprs, chunksize=1):
+        """Yield the value of each expression in the order given."""
+        futures = self._submit(exprs, chunksize)
+        for future, _ in futures:
+            yield from future.result()
+
+    def map_unordered(self, exprs, chunksize=1):
+        """Yield ``(index, value)`` pairs as soon as each chunk is done."""
+        starts = dict(self._submit(exprs, chunksize))
+        for future in as_completed(starts):
+            yield from enumerate(future.result(), starts[future])
+
+    def close(self):
+        self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _submit(self, exprs, chunksize):
+        if chunksize < 1:
+            raise ValueError('chunksize must be at least 1')
+
+        exprs = iter(exprs)
+        futures = []
+        start = 0
+        while True:
+            chunk = list(islice(exprs, chunksize))
+            if not chunk:
+                return futures
+            futures.append((self._executor.submit(_interpret_chunk, chunk),
+                            start))
+            start += len(chunk)
+
+
+_interpreter = None
+
+
+def _init_worker(backend, preload):
+    global _interpreter
+    _interpreter = Interpreter(backend=backend)
+    for source in preload:
+        for _ in _interpreter.interpret_many(source):
+            pass
+
+
+def _interpret_chunk(exprs):
+    return [_interpreter.interpret(expr) if isinstance(expr, str)
+            else _interpreter.evaluate(expr)
+            for expr in exprs]
@@ -0,0 +1,159 @@
+"""Profiling of lispy functions by the names they are defined under.
+
+Only code compiled with a ``Profiler`` is instrumented, so interpreters
+that do not profile run exactly the code they would otherwise.  The
+closure compiler wraps the body of every function with ``instrument``;
+functions bound with ``define`` are reported under that name and others
+as ``<func>``.
+
+A call in tail position ends the calling function's frame, as it does at
+run time: the callee is recorded as called by the caller's caller.  Time
+spent in builtins is counted as time of the lispy function calling them.
+"""
+import marshal
+from time import perf_counter
+
+
+__all__ = ['Profiler', 'FILENAME']
+
+
+FILENAME = '<lispy>'
+
+
+class _Node:
+    """A distinct call stack, as a node in the tree of all of them."""
+
+    __slots__ = ('name', 'parent', 'children', 'exclusive')
+
+    def __init__(self, name, parent):
+        self.name = name
+        self.parent = parent
+        self.children = {}
+        self.exclusive = 0.0
+
+    def child(self, name):
+        node = self.children.get(name)
+        if node is None:
+            node = self.children[name] = _Node(name, self)
+        return node
+
+
+class Profiler:
+    """Call counts, times and call graph of instrumented lispy functions.
+
+    ``functions`` maps each name to ``[primitive calls, calls, exclusive
+    time, inclusive time]`` and ``edges`` maps ``(caller, callee)`` pairs
+    to the same for the calls along that edge; top-level calls have the
+    caller ``None``.  As in ``cProfile``, primitive calls are those not
+    made recursively, and only they add to the inclusive time.
+
+    Recording can be switched off with ``enabled``.  Entering a ``with``
+    block switches it on and leaving it switches it off, so a profiler
+    created with ``enabled=False`` records only inside the block.  The
+    profiler is also accepted by ``pstats.Stats``.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.functions = {}
+        self.edges = {}
+        self._root = _Node(None, None)
+        self._stack = []
+        self._active = {}
+
+    def __enter__(self):
+        self.enabled = True
+        return self
+
+    def __exit__(self, *exc_info):
+        self.enabled = False
+
+    def reset(self):
+        self.functions.clear()
+        self.edges.clear()
+        self._root = _Node(None, None)
+
+    def instrument(self, name, body):
+        """Wrap the compiled ``body`` of function ``name`` to record calls."""
+        stack = self._stack
+        active = self._active
+
+        def profiled(env):
+            if not self.enabled:
+                return body(env)
+
+            parent = stack[-1] if stack else None
+            node = (parent[0] if parent else self._root).child(name)
+            frame = [node, 0.0]
+            active[name] = active.get(name, 0) + 1
+            stack.append(frame)
+            start = perf_counter()
+            try:
+                return body(env)
+            finally:
+                elapsed = perf_counter() - start
+                stack.pop()
+                active[name] -= 1
+                exclusive = elapsed - frame[1]
+                node.exclusive += exclusive
+                if parent is not None:
+                    parent[1] += elapsed
+                caller = parent[0].name if parent else None
+                primitive = not active[name]
+                self._record(self.functions, name, primitive, exclusive,
+                             elapsed)
+                self._record(self.edges, (caller, name), primitive,
+                             exclusive, elapsed)
+
+        return profiled
+
+    @staticmethod
+    def _record(table, key, primitive, exclusive, inclusive):
+        stats = table.get(key)
+        if stats is None:
+            stats = table[key] = [0, 0, 0.0, 0.0]
+        stats[1] += 1
+        stats[2] += exclusive
+        if primitive:
+            stats[0] += 1
+            stats[3] += inclusive
+
+    def create_stats(self):
+        """Fill in ``stats`` in the format ``pstats.Stats`` reads."""
+        callers = {}
+        for (caller, callee), stats in self.edges.items():
+            if caller is not None:
+                callers.setdefault(callee, {})[_key(caller)] = tuple(stats)
+
+        self.stats = {
+            _key(name): tuple(stats) + (callers.get(name, {}),)
+            for name, stats in self.functions.items()}
+
+    def dump_stats(self, file):
+        """Write the stats to ``file`` for ``pstats`` to load."""
+        self.create_stats()
+        with open(file, 'wb') as output:
+            marshal.dump(self.stats, output)
+
+    def collapsed_stacks(self):
+        """Lines ``caller;callee;... microseconds`` of exclusive time.
+
+        This is the input format of flame graph tools such as
+        ``flamegraph.pl``.
+        """
+        lines = []
+        pending = [(child, child.name)
+                   for child in self._root.children.values()]
+        while pending:
+            node, path = pending.pop()
+            if node.exclusive:
+                lines.append('{} {}'.format(
+                    path, round(node.exclusive * 1e6)))
+            pending.extend((child, path + ';' + child.name)
+                           for child in node.children.values())
+        lines.sort()
+        return lines
+
+
+def _key(name):
+    return FILENAME, 0, name
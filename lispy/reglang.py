@@ -1,28 +1,58 @@
+from array import array
 from itertools import chain, starmap
 
 
-__all__ = ['Empty', 'Single', 'Union', 'Con', 'KleeneStar',
+__all__ = ['Empty', 'Single', 'Union', 'Con', 'KleeneStar', 'DFA',
+           'LazyDFA', 'DEAD', 'REJECT', 'tagged_dfa', 'equivalence_classes',
            'union_char', 'char_range', 'string', 'plus']
 
 
+DEAD = -1
+REJECT = -1
+UNKNOWN = -2
+
+MAX_LAZY_STATES = 4096
+
+
 class State:
     def __init__(self, is_final=False):
         self.is_final = is_final
 
 
-class Empty:
+class FA:
+    def char_sets(self):
+        """Sets of characters this automaton may tell apart.
+
+        Characters in the same set, or in none of a set's members, are
+        always treated alike; see ``equivalence_classes``.
+        """
+        return []
+
+    def to_dfa(self, minimize=False):
+        return tagged_dfa(self, minimize=minimize)
+
+    def to_lazy_dfa(self, max_states=MAX_LAZY_STATES):
+        return LazyDFA(self, max_states=max_states)
+
+
+class Empty(FA):
     start_state = State(True)
+    alphabet = frozenset()
 
     def next(self, state, char):
         return None
 
 
-class Single:
+class Single(FA):
     start_state = State()
     final_state = State(True)
 
     def __init__(self, char):
         self.char = char
+        self.alphabet = frozenset(char)
+
+    def char_sets(self):
+        return [self.alphabet]
 
     def next(self, state, char):
         if state == self.start_state and self.char == char:
@@ -38,23 +68,37 @@ class UnionState(State):
         self.states = states
 
     def __eq__(self, other):
-        return self.states == other.states
+        return (isinstance(other, UnionState) and
+                self.states == other.states)
 
     def __ne__(self, other):
-        return self.states != other.states
+        return not self.__eq__(other)
 
     def __hash__(self):
         return hash(self.states)
 
 
-class Union:
+class Union(FA):
     def __init__(self, *fas):
         if len(fas) < 2:
             raise ValueError('At least union 2 finite automata')
 
         self.fas = fas
+        self.alphabet = frozenset().union(*(fa.alphabet for fa in fas))
         self.start_state = UnionState(tuple(fa.start_state for fa in fas))
 
+    @property
+    def is_char_set(self):
+        """Whether this only matches one character out of ``alphabet``."""
+        return all(isinstance(fa, Single) or
+                   (isinstance(fa, Union) and fa.is_char_set)
+                   for fa in self.fas)
+
+    def char_sets(self):
+        if self.is_char_set:
+            return [self.alphabet]
+        return [chars for fa in self.fas for chars in fa.char_sets()]
+
     def next(self, state, char):
         if state is None:
             return None
@@ -73,7 +117,8 @@ class ConState(State):
         self.fa_states = fa_states
 
     def __eq__(self, other):
-        return self.fa_states == other.fa_states
+        return (isinstance(other, ConState) and
+                self.fa_states == other.fa_states)
 
     def __ne__(self, other):
         return not self.__eq__(other)
@@ -82,14 +127,18 @@ class ConState(State):
         return hash(self.fa_states)
 
 
-class Con:
+class Con(FA):
     def __init__(self, *fas):
         if len(fas) < 2:
             raise ValueError('At least concatenate 2 finite automata')
 
         self.fas = fas
+        self.alphabet = frozenset().union(*(fa.alphabet for fa in fas))
         self.start_state = ConState(((0, fas[0].start_state),))
 
+    def char_sets(self):
+        return [chars for fa in self.fas for chars in fa.char_sets()]
+
     def next(self, state, char):
         if state is None:
             return None
@@ -126,7 +175,8 @@ class KleeneStarState(State):
         self.states = states
 
     def __eq__(self, other):
-        return self.states == other.states
+        return (isinstance(other, KleeneStarState) and
+                self.states == other.states)
 
     def __ne__(self, other):
         return not self.__eq__(other)
@@ -135,13 +185,20 @@ class KleeneStarState(State):
         return hash(self.states)
 
 
-class KleeneStar:
+class KleeneStar(FA):
     def __init__(self, fa):
         self.fa = fa
+        self.alphabet = fa.alphabet
         self.start_state = KleeneStarState(frozenset([self.fa.start_state]),
                                            is_final=True)
 
+    def char_sets(self):
+        return self.fa.char_sets()
+
     def next(self, state, char):
+        if state is None:
+            return None
+
         next_states = map(lambda s: self.fa.next(s, char), state.states)
         filtered = list(filter(None, next_states))
         if filtered:
@@ -155,6 +212,342 @@ class KleeneStar:
             return None
 
 
+class DFA:
+    """Table-driven deterministic automaton with integer states.
+
+    Columns stand for the equivalence ``classes`` of the alphabet, strings
+    of characters all automata treat alike.  ``columns`` maps every
+    character of the alphabet to its column.
+
+    The transitions of state ``s`` on the characters of column ``c`` live
+    at ``table[s * width + c]``; missing transitions are ``DEAD``.
+    ``tags[s]`` is the index of the automaton accepting in ``s``, or
+    ``REJECT`` if ``s`` is not final.
+    """
+
+    start_state = 0
+
+    def __init__(self, classes, table, tags):
+        self.classes = tuple(classes)
+        self.alphabet = ''.join(sorted(chain.from_iterable(self.classes)))
+        self.columns = {char: column
+                        for column, chars in enumerate(self.classes)
+                        for char in chars}
+        self.width = len(self.classes)
+        self.table = table
+        self.tags = tags
+
+    @property
+    def state_count(self):
+        return len(self.tags)
+
+    def next(self, state, char):
+        column = self.columns.get(char)
+        if column is None:
+            return None
+
+        next_state = self.table[state * self.width + column]
+        return None if next_state == DEAD else next_state
+
+    def is_final(self, state):
+        return self.tags[state] != REJECT
+
+    def accepts(self, string):
+        columns = self.columns
+        table = self.table
+        width = self.width
+        state = self.start_state
+
+        for char in string:
+            column = columns.get(char)
+            if column is None:
+                return False
+            state = table[state * width + column]
+            if state == DEAD:
+                return False
+
+        return self.tags[state] != REJECT
+
+    def minimize(self):
+        """Merge equivalent states with Hopcroft's partition refinement.
+
+        States start out grouped by tag, so states accepting for different
+        automata are never merged.  Missing transitions are routed to an
+        explicit sink state so that states which can never reach a final
+        state collapse into it and come out as ``DEAD`` again.
+        """
+        width = self.width
+        table = self.table
+        sink = self.state_count
+
+        inverse = [[[] for _ in range(sink + 1)] for _ in range(width)]
+        for state in range(sink):
+            row = state * width
+            for column in range(width):
+                target = table[row + column]
+                inverse[column][sink if target == DEAD else target].append(
+                    state)
+        for column in range(width):
+            inverse[column][sink].append(sink)
+
+        by_tag = {REJECT: {sink}}
+        for state in range(sink):
+            by_tag.setdefault(self.tags[state], set()).add(state)
+        blocks = list(by_tag.values())
+        block_of = [0] * (sink + 1)
+        for index, block in enumerate(blocks):
+            for state in block:
+                block_of[state] = index
+
+        pending = set(range(len(blocks)))
+        while pending:
+            splitter = list(blocks[pending.pop()])
+
+            for column in range(width):
+                predecessors = inverse[column]
+                touched = {}
+                for target in splitter:
+                    for state in predecessors[target]:
+                        touched.setdefault(block_of[state], set()).add(state)
+
+                for index, members in touched.items():
+                    block = blocks[index]
+                    if len(members) == len(block):
+                        continue
+
+                    block -= members
+                    new_index = len(blocks)
+                    blocks.append(members)
+                    for state in members:
+                        block_of[state] = new_index
+
+                    if index in pending or len(members) <= len(block):
+                        pending.add(new_index)
+                    else:
+                        pending.add(index)
+
+        sink_block = block_of[sink]
+        order = [block_of[self.start_state]]
+        numbers = {order[0]: 0}
+        min_table = array('i')
+        min_tags = array('i')
+
+        i = 0
+        while i < len(order):
+            state = min(blocks[order[i]])
+            min_tags.append(self.tags[state] if state != sink else REJECT)
+
+            row = state * width
+            for column in range(width):
+                target = table[row + column] if state != sink else DEAD
+                if target == DEAD or block_of[target] == sink_block:
+                    min_table.append(DEAD)
+                    continue
+
+                target_block = block_of[target]
+                number = numbers.get(target_block)
+                if number is None:
+                    number = numbers[target_block] = len(order)
+                    order.append(target_block)
+                min_table.append(number)
+
+            i += 1
+
+        return DFA(self.classes, min_table, min_tags)
+
+
+class LazyDFA:
+    """DFA of the union of ``fas`` built while it is being run.
+
+    A state and its row of transitions are only determinized when a match
+    first reaches them; until then the row holds ``UNKNOWN``.  At most
+    ``max_states`` states are kept: when another one is needed the cache is
+    flushed and rebuilt from the start state, the state the match is in and
+    the one it moves to, so memory stays bounded even for automata whose
+    full DFA is exponentially large.  ``max_states`` must therefore be at
+    least 3.  ``flushes`` counts how often the cache was flushed.
+
+    States are numbered like those of ``DFA`` and tagged the same way as by
+    ``tagged_dfa``, but a number is only valid until the next flush.
+    """
+
+    start_state = 0
+
+    def __init__(self, *fas, max_states=MAX_LAZY_STATES):
+        if max_states < 3:
+            raise ValueError('A lazy DFA needs room for at least 3 states')
+
+        if len(fas) == 1:
+            self.fa, = fas
+            self._tag = _single_tag
+        else:
+            self.fa = Union(*fas)
+            self._tag = _union_tag
+
+        self.classes = equivalence_classes(*fas)
+        self.alphabet = ''.join(sorted(self.fa.alphabet))
+        self.columns = {char: column
+                        for column, chars in enumerate(self.classes)
+                        for char in chars}
+        self.width = len(self.classes)
+        self.max_states = max_states
+        self.flushes = 0
+        self._reset()
+
+    def _reset(self):
+        self._states = []
+        self._indices = {}
+        self.table = array('i')
+        self.tags = array('i')
+        self._add(self.fa.start_state)
+
+    def _add(self, fa_state):
+        index = self._indices[fa_state] = len(self._states)
+        self._states.append(fa_state)
+        self.table.extend([UNKNOWN] * self.width)
+        self.tags.append(self._tag(fa_state))
+        return index
+
+    def _transition(self, state, column):
+        fa_state = self._states[state]
+        next_fa_state = self.fa.next(fa_state, self.classes[column][0])
+        if next_fa_state is None:
+            self.table[state * self.width + column] = DEAD
+            return DEAD
+
+        index = self._indices.get(next_fa_state)
+        if index is None:
+            if len(self._states) >= self.max_states:
+                self.flushes += 1
+                self._reset()
+                state = self._indices.get(fa_state)
+                if state is None:
+                    state = self._add(fa_state)
+            index = self._indices.get(next_fa_state)
+            if index is None:
+                index = self._add(next_fa_state)
+
+        self.table[state * self.width + column] = index
+        return index
+
+    @property
+    def state_count(self):
+        return len(self.tags)
+
+    def next(self, state, char):
+        column = self.columns.get(char)
+        if column is None:
+            return None
+
+        next_state = self.table[state * self.width + column]
+        if next_state == UNKNOWN:
+            next_state = self._transition(state, column)
+        return None if next_state == DEAD else next_state
+
+    def is_final(self, state):
+        return self.tags[state] != REJECT
+
+    def accepts(self, string):
+        columns = self.columns
+        table = self.table
+        width = self.width
+        state = self.start_state
+
+        for char in string:
+            column = columns.get(char)
+            if column is None:
+                return False
+            next_state = table[state * width + column]
+            if next_state == UNKNOWN:
+                next_state = self._transition(state, column)
+                table = self.table
+            if next_state == DEAD:
+                return False
+            state = next_state
+
+        return self.tags[state] != REJECT
+
+
+def tagged_dfa(*fas, minimize=False):
+    """Compile the union of ``fas`` into one DFA.
+
+    A final state is tagged with the index of the first automaton in
+    ``fas`` that accepts there, so earlier automata take priority.
+    """
+    classes = equivalence_classes(*fas)
+    if len(fas) == 1:
+        fa, = fas
+        return _determinize(fa, classes, _single_tag, minimize)
+    else:
+        return _determinize(Union(*fas), classes, _union_tag, minimize)
+
+
+def _single_tag(state):
+    return 0 if state.is_final else REJECT
+
+
+def _union_tag(state):
+    for i, sub_state in enumerate(state.states):
+        if sub_state is not None and sub_state.is_final:
+            return i
+    return REJECT
+
+
+def _determinize(fa, classes, tag, minimize):
+    states = [fa.start_state]
+    indices = {fa.start_state: 0}
+    table = array('i')
+    tags = array('i')
+
+    i = 0
+    while i < len(states):
+        state = states[i]
+        tags.append(tag(state))
+
+        for chars in classes:
+            next_state = fa.next(state, chars[0])
+            if next_state is None:
+                table.append(DEAD)
+                continue
+
+            index = indices.get(next_state)
+            if index is None:
+                index = indices[next_state] = len(states)
+                states.append(next_state)
+            table.append(index)
+
+        i += 1
+
+    dfa = DFA(classes, table, tags)
+    return dfa.minimize() if minimize else dfa
+
+
+def equivalence_classes(*fas):
+    """Partition the alphabet of ``fas`` into classes of equivalent chars.
+
+    Starting from the whole alphabet, every class is split by each of the
+    ``char_sets`` of every automaton, so two characters end up together
+    only if no part of any automaton can tell them apart.  The automata
+    are never treated as one ``Union``, which could merge characters that
+    different automata accept and so lose their tags.  Returns the classes
+    as sorted strings, ordered by their first character.
+    """
+    alphabet = frozenset().union(*(fa.alphabet for fa in fas))
+    classes = [alphabet] if alphabet else []
+    for chars in {chars for fa in fas for chars in fa.char_sets()}:
+        refined = []
+        for cls in classes:
+            inside = cls & chars
+            if inside and len(inside) < len(cls):
+                refined.append(inside)
+                refined.append(cls - inside)
+            else:
+                refined.append(cls)
+        classes = refined
+
+    return sorted(''.join(sorted(cls)) for cls in classes)
+
+
 def union_char(chars):
     return Union(*map(Single, chars))
 
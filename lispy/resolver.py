@@ -0,0 +1,149 @@
+"""Compile-time resolution of variable references to frame slots.
+
+A function frame is a Python list holding the arguments, then the locals
+defined in the body, then the frame the function was created in.  A local
+reference resolves to ``(depth, index)``: follow the last element ``depth``
+times and read ``frame[index]``.  Anything not bound by an enclosing
+function is a global and is looked up by name in ``vars_``.
+"""
+from collections import ChainMap
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from lispy import builtins
+from lispy.parser import List, Symbol
+
+
+__all__ = ['UNBOUND', 'Scope', 'global_value', 'recording_globals',
+           'defined_names']
+
+
+class _Unbound:
+    def __repr__(self):
+        return 'UNBOUND'
+
+
+UNBOUND = _Unbound()
+
+
+class Scope:
+    """Names bound by one function, with the scope it was defined in.
+
+    Locals created by ``define`` start out ``UNBOUND`` and, like with the
+    ``ChainMap`` environments of the tree walker, fall back to the name in
+    the enclosing scopes, and finally to the global, until they are
+    assigned; see ``lookup``.
+    """
+
+    __slots__ = ('params', 'names', 'indices', 'parent')
+
+    def __init__(self, params, defined, parent):
+        self.params = params
+        self.names = params + [name for name in defined if name not in params]
+        self.indices = {name: i for i, name in enumerate(self.names)}
+        self.parent = parent
+
+    def resolve(self, identifier):
+        """Return ``(depth, index, is_param)``, or ``None`` for a global."""
+        scope = self
+        depth = 0
+        while scope is not None:
+            index = scope.indices.get(identifier)
+            if index is not None:
+                return depth, index, index < len(scope.params)
+            scope = scope.parent
+            depth += 1
+        return None
+
+    def enclosing(self, depth):
+        scope = self
+        for _ in range(depth):
+            scope = scope.parent
+        return scope
+
+    def lookup(self, frame, identifier, vars_):
+        """Run-time value of ``identifier`` in ``frame``, a frame of this
+        scope, skipping locals that are still ``UNBOUND``."""
+        scope = self
+        while scope is not None:
+            index = scope.indices.get(identifier)
+            if index is not None:
+                value = frame[index]
+                if value is not UNBOUND:
+                    return value
+            frame = frame[-1]
+            scope = scope.parent
+        return vars_[identifier]
+
+    def frame_tail(self, env):
+        return [UNBOUND] * (len(self.names) - len(self.params)) + [env]
+
+    def mapping(self, frame, vars_):
+        """Environment mapping for macros expanded inside this scope."""
+        maps = []
+        scope = self
+        while scope is not None:
+            maps.append({name: value
+                         for name, value in zip(scope.names, frame)
+                         if value is not UNBOUND})
+            frame = frame[-1]
+            scope = scope.parent
+        maps.append(vars_)
+        return ChainMap(*maps)
+
+
+def global_value(ast, vars_, scope):
+    """Compile-time binding of ``ast`` if it is a global symbol."""
+    if ast.__class__ is not Symbol:
+        return None
+    if scope is not None and scope.resolve(ast.identifier) is not None:
+        return None
+
+    value = vars_.get(ast.identifier)
+    bindings = _bindings.get()
+    if bindings is not None:
+        bindings[ast.identifier] = value
+    return value
+
+
+@contextmanager
+def recording_globals():
+    """Collect the globals ``global_value`` looks up inside the block.
+
+    Yields a dict filled with each name and the value, or ``None``, it
+    was bound to.  Compiled code is only valid as long as these bindings
+    stay the same.
+    """
+    bindings = {}
+    token = _bindings.set(bindings)
+    try:
+        yield bindings
+    finally:
+        _bindings.reset(token)
+
+
+_bindings = ContextVar('bindings', default=None)
+
+
+def defined_names(body, params, vars_, parent):
+    """Names a function body binds with ``define``, outside nested funcs."""
+    scope = Scope(params, [], parent)
+    names = []
+    pending = [body]
+
+    while pending:
+        ast = pending.pop()
+        if not isinstance(ast, List) or ast.is_empty:
+            continue
+
+        binding = global_value(ast.head, vars_, scope)
+        if binding is builtins.func:
+            continue
+        if binding is builtins.define:
+            elements = ast.elements
+            if len(elements) == 3 and elements[1].__class__ is Symbol:
+                names.append(elements[1].identifier)
+
+        pending.extend(reversed(ast.elements))
+
+    return names
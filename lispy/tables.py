@@ -0,0 +1,115 @@
+"""Precompiled lexer tables, so startup need not build the lexer DFA.
+
+The tables are generated with ``python -m lispy.tables`` into
+``lexer.tables`` next to this module.  The file starts with a header of
+the magic bytes, a fingerprint of the sources the tables are built from,
+the byte order and item size of the arrays and their sizes.  It is
+followed by the characters of the ``DFA``'s equivalence classes in UTF-8,
+one class after another, and the raw arrays of the class sizes, ``table``
+and ``tags``, each read back with one ``array.frombytes``.
+
+``load`` returns ``None`` for a missing, stale or foreign file, in which
+case the lexer builds its DFA at run time.
+"""
+import hashlib
+import os
+import struct
+import sys
+from array import array
+
+from lispy.reglang import DFA
+
+
+__all__ = ['PATH', 'fingerprint', 'dump', 'load']
+
+
+PATH = os.path.join(os.path.dirname(__file__), 'lexer.tables')
+
+MAGIC = b'LISPYDF2'
+
+SOURCES = ['lexer.py', 'reglang.py']
+
+_header = struct.Struct('<8s32s2sBIIII')
+
+
+def fingerprint():
+    """Hash of the sources the lexer DFA is built from."""
+    digest = hashlib.sha256()
+    directory = os.path.dirname(__file__)
+    for source in SOURCES:
+        with open(os.path.join(directory, source), 'rb') as file:
+            digest.update(file.read())
+    return digest.digest()
+
+
+def dump(dfa, path=PATH):
+    chars = ''.join(dfa.classes).encode('utf-8')
+    sizes = array('i', map(len, dfa.classes))
+    header = _header.pack(MAGIC, fingerprint(), _byteorder(),
+                          dfa.table.itemsize, dfa.state_count, dfa.width,
+                          len(dfa.alphabet), len(chars))
+    with open(path, 'wb') as file:
+        file.write(header)
+        file.write(chars)
+        file.write(sizes.tobytes())
+        file.write(dfa.table.tobytes())
+        file.write(dfa.tags.tobytes())
+
+
+def load(path=PATH):
+    try:
+        with open(path, 'rb') as file:
+            data = file.read()
+        current = fingerprint()
+    except OSError:
+        return None
+
+    if len(data) < _header.size:
+        return None
+    (magic, source_fingerprint, byteorder, itemsize, state_count, width,
+     char_count, chars_size) = _header.unpack_from(data)
+    sizes = array('i')
+    table = array('i')
+    tags = array('i')
+    if (magic != MAGIC or source_fingerprint != current
+            or byteorder != _byteorder() or itemsize != table.itemsize):
+        return None
+
+    start = _header.size
+    sizes_start = start + chars_size
+    table_start = sizes_start + width * itemsize
+    tags_start = table_start + state_count * width * itemsize
+    end = tags_start + state_count * itemsize
+    if len(data) != end:
+        return None
+
+    chars = data[start:sizes_start].decode('utf-8')
+    sizes.frombytes(data[sizes_start:table_start])
+    table.frombytes(data[table_start:tags_start])
+    tags.frombytes(data[tags_start:end])
+    if len(chars) != char_count or sum(sizes) != char_count:
+        return None
+
+    classes = []
+    offset = 0
+    for size in sizes:
+        classes.append(chars[offset:offset + size])
+        offset += size
+    return DFA(classes, table, tags)
+
+
+def _byteorder():
+    return sys.byteorder[:2].encode('ascii')
+
+
+def main():
+    from lispy.lexer import build_dfa
+
+    dfa = build_dfa()
+    dump(dfa)
+    print('Wrote {} states x {} columns to {}'.format(
+        dfa.state_count, dfa.width, PATH))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""Packed vectors of floats with element-wise operations done in C.
+
+Elements are stored in a NumPy ``float64`` array when NumPy is installed
+and in an ``array('d')`` otherwise; both backends give the same results.
+"""
+import operator
+from array import array
+from itertools import repeat
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+__all__ = ['Vector']
+
+
+class Vector:
+    """Immutable vector of floats.
+
+    ``values`` is any iterable of numbers.  Binary operations take another
+    ``Vector`` of the same length or a number, which is applied to every
+    element.
+    """
+
+    __slots__ = ('data',)
+
+    def __init__(self, values=()):
+        if numpy is not None:
+            self.data = numpy.fromiter(values, dtype=numpy.float64)
+        else:
+            self.data = array('d', values)
+
+    @classmethod
+    def _wrap(cls, data):
+        vector = object.__new__(cls)
+        vector.data = data
+        return vector
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, index):
+        return float(self.data[index])
+
+    def __iter__(self):
+        return map(float, self.data)
+
+    def add(self, other):
+        return self._binary(other, operator.add)
+
+    def mul(self, other):
+        return self._binary(other, operator.mul)
+
+    def sum(self):
+        if numpy is not None:
+            return float(self.data.sum())
+        return sum(self.data)
+
+    def dot(self, other):
+        self._check_length(other)
+        if numpy is not None:
+            return float(numpy.dot(self.data, other.data))
+        return sum(map(operator.mul, self.data, other.data))
+
+    def slice(self, start, stop=None):
+        if numpy is not None:
+            return Vector._wrap(self.data[start:stop].copy())
+        return Vector._wrap(self.data[start:stop])
+
+    def _binary(self, other, op):
+        if isinstance(other, Vector):
+            self._check_length(other)
+            if numpy is not None:
+                return Vector._wrap(op(self.data, other.data))
+            return Vector._wrap(array('d', map(op, self.data, other.data)))
+
+        scalar = float(other)
+        if numpy is not None:
+            return Vector._wrap(op(self.data, scalar))
+        return Vector._wrap(array('d', map(op, self.data, repeat(scalar))))
+
+    def _check_length(self, other):
+        if len(self.data) != len(other.data):
+            raise ValueError('Vector lengths differ: {} and {}'.format(
+                len(self.data), len(other.data)))
+
+    def __eq__(self, other):
+        if other.__class__ is not Vector:
+            return NotImplemented
+        return len(self) == len(other) and all(
+            map(operator.eq, self.data, other.data))
+
+    def __hash__(self):
+        return hash(tuple(self))
+
+    def __reduce__(self):
+        return Vector, (list(self),)
+
+    def __repr__(self):
+        return 'Vector({!r})'.format(list(self))
+
+    def __str__(self):
+        return '#({})'.format(' '.join(str(value) for value in self))
@@ -0,0 +1,476 @@
+"""Bytecode compiler and stack-based virtual machine.
+
+Every instruction is three bytes: an opcode followed by a little-endian
+16-bit argument.  Calls between compiled functions push frames on an
+explicit frame stack instead of the Python stack, and calls in tail
+position reuse the current frame.  Variables are resolved as by
+``lispy.resolver``: locals live in list frames, globals in ``vars_``.
+"""
+from lispy import builtins
+from lispy.compiler import func_params, unpack_form
+from lispy.evaluator import ismacro
+from lispy.parser import List, Quotation, Number, Symbol
+from lispy.resolver import UNBOUND, Scope, global_value, defined_names
+
+
+__all__ = ['Code', 'Function', 'Execution', 'compile_ast', 'execute',
+           'disassemble']
+
+
+CONST = 0
+LOAD_GLOBAL = 1
+STORE_GLOBAL = 2
+POP = 3
+CALL = 4
+TAIL_CALL = 5
+RETURN = 6
+JUMP = 7
+JUMP_IF_FALSE = 8
+MAKE_FUNC = 9
+MACRO = 10
+ADD = 11
+SUB = 12
+MUL = 13
+DIV = 14
+LOAD_LOCAL = 15
+STORE_LOCAL = 16
+LOAD_FREE = 17
+LOAD_DEFINED = 18
+
+opnames = ['CONST', 'LOAD_GLOBAL', 'STORE_GLOBAL', 'POP', 'CALL',
+           'TAIL_CALL', 'RETURN', 'JUMP', 'JUMP_IF_FALSE', 'MAKE_FUNC',
+           'MACRO', 'ADD', 'SUB', 'MUL', 'DIV', 'LOAD_LOCAL', 'STORE_LOCAL',
+           'LOAD_FREE', 'LOAD_DEFINED']
+
+MAX_ARG = 0xffff
+
+
+class Code:
+    """Compiled function body, or top-level expression if ``scope`` is None.
+
+    ``names`` holds the global names, ``vars_`` the globals they are looked
+    up in.
+    """
+
+    __slots__ = ('name', 'scope', 'instructions', 'constants', 'names',
+                 'vars_')
+
+    def __init__(self, name, scope, instructions, constants, names, vars_):
+        self.name = name
+        self.scope = scope
+        self.instructions = instructions
+        self.constants = constants
+        self.names = names
+        self.vars_ = vars_
+
+    def __call__(self, env):
+        return execute(self, env)
+
+    def __repr__(self):
+        return '<code {}>'.format(self.name)
+
+
+class Function:
+    """Function created by ``func`` under the VM.
+
+    The VM calls it without growing the Python stack; calling it from
+    Python, e.g. from a builtin, runs a nested VM.
+    """
+
+    __slots__ = ('code', 'arity', 'frame_tail')
+
+    def __init__(self, code, env):
+        self.code = code
+        self.arity = len(code.scope.params)
+        self.frame_tail = code.scope.frame_tail(env)
+
+    def bind(self, args):
+        if len(args) != self.arity:
+            raise TypeError('{} expects {} arguments, got {}'.format(
+                self.code.name, self.arity, len(args)))
+        return args + self.frame_tail
+
+    def __call__(self, args):
+        return execute(self.code, self.bind(args))
+
+    def __repr__(self):
+        return '<function {}>'.format(self.code.name)
+
+
+def compile_ast(ast, vars_):
+    """Compile ``ast`` into a ``Code`` object to ``execute``.
+
+    As in ``lispy.compiler``, special forms are recognised from their
+    bindings in ``vars_`` at compile time.  Calls of the arithmetic builtins
+    get an ``ADD``, ``SUB``, ``MUL`` or ``DIV`` before the ``CALL``, which
+    computes the result directly and skips the call as long as the function
+    called is still the builtin.
+    """
+    assembler = _Assembler('<top>', None, vars_)
+    assembler.compile(ast, vars_, None, False)
+    assembler.emit(RETURN)
+    return assembler.assemble()
+
+
+def execute(code, env):
+    """Run ``code`` with ``env`` as its frame, or ``vars_`` at top level."""
+    execution = Execution(code, env)
+    execution.run()
+    return execution.value
+
+
+class Execution:
+    """A resumable run of ``code``.
+
+    ``run`` can stop after a number of reductions, i.e. calls of compiled
+    functions, and pick up from there on the next call.  All state lives in
+    the value and frame stacks, so suspending needs no Python frames.
+    """
+
+    def __init__(self, code, env):
+        self.done = False
+        self.value = None
+        self._save(code, 0, env, [], [])
+
+    def _save(self, code, pc, env, stack, frames):
+        self._code = code
+        self._pc = pc
+        self._env = env
+        self._stack = stack
+        self._frames = frames
+
+    def run(self, reductions=None):
+        """Run until finished or after ``reductions`` calls.
+
+        Returns whether the run finished, in which case its result is in
+        ``value``.
+        """
+        if self.done:
+            return True
+
+        budget = -1 if reductions is None else reductions
+        code = self._code
+        pc = self._pc
+        env = self._env
+        stack = self._stack
+        frames = self._frames
+        instructions = code.instructions
+        constants = code.constants
+        names = code.names
+        vars_ = code.vars_
+
+        while True:
+            op = instructions[pc]
+            arg = instructions[pc + 1] | instructions[pc + 2] << 8
+            pc += 3
+
+            if op == LOAD_LOCAL:
+                stack.append(env[arg])
+            elif op == LOAD_GLOBAL:
+                stack.append(vars_[names[arg]])
+            elif op == CONST:
+                stack.append(constants[arg])
+            elif op == CALL or op == TAIL_CALL:
+                args = stack[len(stack) - arg:]
+                del stack[len(stack) - arg:]
+                func = stack.pop()
+                if func.__class__ is Function:
+                    if budget == 0:
+                        stack.append(func)
+                        stack.extend(args)
+                        self._save(code, pc - 3, env, stack, frames)
+                        return False
+                    budget -= 1
+                    frame = func.bind(args)
+                    if op == CALL:
+                        frames.append((code, pc, env))
+                    code = func.code
+                    instructions = code.instructions
+                    constants = code.constants
+                    names = code.names
+                    vars_ = code.vars_
+                    pc = 0
+                    env = frame
+                else:
+                    stack.append(func(args))
+            elif op == JUMP_IF_FALSE:
+                if not stack.pop():
+                    pc = arg
+            elif op == JUMP:
+                pc = arg
+            elif op == RETURN:
+                if not frames:
+                    self.value = stack.pop()
+                    self.done = True
+                    return True
+                code, pc, env = frames.pop()
+                instructions = code.instructions
+                constants = code.constants
+                names = code.names
+                vars_ = code.vars_
+            elif op == ADD:
+                if stack[-arg - 1] is builtins.add:
+                    if arg == 2:
+                        b = stack.pop()
+                        a = stack.pop()
+                        stack[-1] = Number(a.value + b.value)
+                    else:
+                        stack.append(_arithmetic(builtins.add, stack, arg))
+                    pc += 3
+            elif op == SUB:
+                if stack[-arg - 1] is builtins.minus:
+                    if arg == 2:
+                        b = stack.pop()
+                        a = stack.pop()
+                        stack[-1] = Number(a.value - b.value)
+                    else:
+                        stack.append(_arithmetic(builtins.minus, stack, arg))
+                    pc += 3
+            elif op == MUL:
+                if stack[-arg - 1] is builtins.mult:
+                    if arg == 2:
+                        b = stack.pop()
+                        a = stack.pop()
+                        stack[-1] = Number(a.value * b.value)
+                    else:
+                        stack.append(_arithmetic(builtins.mult, stack, arg))
+                    pc += 3
+            elif op == DIV:
+                if stack[-arg - 1] is builtins.div:
+                    if arg == 2:
+                        b = stack.pop()
+                        a = stack.pop()
+                        stack[-1] = Number(a.value / b.value)
+                    else:
+                        stack.append(_arithmetic(builtins.div, stack, arg))
+                    pc += 3
+            elif op == LOAD_FREE:
+                depth, index = constants[arg]
+                frame = env
+                for _ in range(depth):
+                    frame = frame[-1]
+                stack.append(frame[index])
+            elif op == LOAD_DEFINED:
+                depth, index, identifier, defining = constants[arg]
+                frame = env
+                for _ in range(depth):
+                    frame = frame[-1]
+                value = frame[index]
+                if value is UNBOUND:
+                    value = defining.lookup(frame, identifier, vars_)
+                stack.append(value)
+            elif op == STORE_LOCAL:
+                env[arg] = stack.pop()
+                stack.append(None)
+            elif op == STORE_GLOBAL:
+                vars_[names[arg]] = stack.pop()
+                stack.append(None)
+            elif op == POP:
+                stack.pop()
+            elif op == MAKE_FUNC:
+                stack.append(Function(constants[arg], env))
+            elif op == MACRO:
+                macro, args = constants[arg]
+                scope = code.scope
+                mapping = vars_ if scope is None else scope.mapping(env, vars_)
+                stack.append(macro(mapping, args))
+            else:
+                raise RuntimeError('Unknown opcode: {}'.format(op))
+
+
+def _arithmetic(func, stack, count):
+    args = stack[len(stack) - count:]
+    del stack[len(stack) - count - 1:]
+    return func(args)
+
+
+def disassemble(code):
+    """Return a listing of ``code`` and the functions nested in it."""
+    lines = []
+    _disassemble(code, lines)
+    return '\n'.join(lines)
+
+
+def _disassemble(code, lines):
+    params = ' '.join(code.scope.params) if code.scope is not None else ''
+    lines.append('{} ({}):'.format(code.name, params))
+    nested = []
+    instructions = code.instructions
+
+    for pc in range(0, len(instructions), 3):
+        op = instructions[pc]
+        arg = instructions[pc + 1] | instructions[pc + 2] << 8
+        if op in (CONST, MAKE_FUNC):
+            value = code.constants[arg]
+            detail = ' ({})'.format(value.name if op == MAKE_FUNC else value)
+            if op == MAKE_FUNC:
+                nested.append(value)
+        elif op in (LOAD_GLOBAL, STORE_GLOBAL):
+            detail = ' ({})'.format(code.names[arg])
+        elif op in (LOAD_LOCAL, STORE_LOCAL):
+            detail = ' ({})'.format(code.scope.names[arg])
+        elif op == LOAD_FREE:
+            detail = ' {}'.format(code.constants[arg])
+        elif op == LOAD_DEFINED:
+            detail = ' {}'.format(code.constants[arg][:3])
+        elif op == MACRO:
+            macro, args = code.constants[arg]
+            detail = ' ({} {})'.format(macro.__name__, args)
+        else:
+            detail = ''
+        lines.append('{:>6} {:<14}{:>5}{}'.format(pc, opnames[op], arg,
+                                                 detail))
+
+    for code in nested:
+        lines.append('')
+        _disassemble(code, lines)
+
+
+class _Assembler:
+    def __init__(self, name, scope, vars_):
+        self.name = name
+        self.scope = scope
+        self.vars_ = vars_
+        self.instructions = bytearray()
+        self.constants = []
+        self.names = []
+        self.name_indices = {}
+
+    def emit(self, op, arg=0):
+        if arg > MAX_ARG:
+            raise SyntaxError('Bytecode argument too large: {}'.format(arg))
+        position = len(self.instructions)
+        self.instructions += bytes((op, arg & 0xff, arg >> 8))
+        return position
+
+    def patch(self, position, target):
+        if target > MAX_ARG:
+            raise SyntaxError('Jump target too far: {}'.format(target))
+        self.instructions[position + 1] = target & 0xff
+        self.instructions[position + 2] = target >> 8
+
+    def constant(self, value):
+        self.constants.append(value)
+        return len(self.constants) - 1
+
+    def name_index(self, identifier):
+        index = self.name_indices.get(identifier)
+        if index is None:
+            index = self.name_indices[identifier] = len(self.names)
+            self.names.append(identifier)
+        return index
+
+    def assemble(self):
+        return Code(self.name, self.scope, bytes(self.instructions),
+                    tuple(self.constants), tuple(self.names), self.vars_)
+
+    def compile(self, ast, vars_, scope, tail):
+        cls = ast.__class__
+        if isinstance(ast, List):
+            self.compile_list(ast, vars_, scope, tail)
+        elif cls is Symbol:
+            self.compile_symbol(ast.identifier, scope)
+        elif cls is Quotation:
+            self.emit(CONST, self.constant(ast.expr))
+        else:
+            self.emit(CONST, self.constant(ast))
+
+    def compile_symbol(self, identifier, scope):
+        resolved = scope.resolve(identifier) if scope is not None else None
+        if resolved is None:
+            self.emit(LOAD_GLOBAL, self.name_index(identifier))
+            return
+
+        depth, index, is_param = resolved
+        if not is_param:
+            self.emit(LOAD_DEFINED, self.constant(
+                (depth, index, identifier, scope.enclosing(depth))))
+        elif depth == 0:
+            self.emit(LOAD_LOCAL, index)
+        else:
+            self.emit(LOAD_FREE, self.constant((depth, index)))
+
+    def compile_list(self, list_, vars_, scope, tail):
+        head = list_.head
+        args = list_.tail
+
+        funcobj = global_value(head, vars_, scope)
+        if ismacro(funcobj):
+            special = _special_forms.get(funcobj)
+            if special is not None:
+                special(self, args, vars_, scope, tail)
+            else:
+                self.emit(MACRO, self.constant((funcobj, args)))
+            return
+
+        self.compile(head, vars_, scope, False)
+        count = 0
+        for arg in args:
+            self.compile(arg, vars_, scope, False)
+            count += 1
+        op = _arithmetic_ops.get(funcobj) if callable(funcobj) else None
+        if op is not None:
+            self.emit(op, count)
+        self.emit(TAIL_CALL if tail else CALL, count)
+
+    def compile_define(self, args, vars_, scope, tail):
+        name, ast = unpack_form('define', args, 2)
+        if name.__class__ is not Symbol:
+            raise SyntaxError('define expects a symbol, got: {}'.format(name))
+
+        if (isinstance(ast, List) and
+                global_value(ast.head, vars_, scope) is builtins.func):
+            self.compile_func(ast.tail, vars_, scope, False, name.identifier)
+        else:
+            self.compile(ast, vars_, scope, False)
+
+        if scope is None:
+            self.emit(STORE_GLOBAL, self.name_index(name.identifier))
+        else:
+            self.emit(STORE_LOCAL, scope.indices[name.identifier])
+
+    def compile_func(self, args, vars_, scope, tail, name='<func>'):
+        arglist, definition = unpack_form('func', args, 2)
+        params = func_params(arglist)
+        func_scope = Scope(params,
+                           defined_names(definition, params, vars_, scope),
+                           scope)
+
+        assembler = _Assembler(name, func_scope, vars_)
+        assembler.compile(definition, vars_, func_scope, True)
+        assembler.emit(RETURN)
+        self.emit(MAKE_FUNC, self.constant(assembler.assemble()))
+
+    def compile_cond(self, args, vars_, scope, tail):
+        jumps = []
+        for arg in args:
+            condition, expr = unpack_form('cond clause', arg, 2)
+            self.compile(condition, vars_, scope, False)
+            skip = self.emit(JUMP_IF_FALSE)
+            self.compile(expr, vars_, scope, tail)
+            jumps.append(self.emit(JUMP))
+            self.patch(skip, len(self.instructions))
+
+        self.emit(CONST, self.constant(None))
+        for jump in jumps:
+            self.patch(jump, len(self.instructions))
+
+    def compile_atom(self, args, vars_, scope, tail):
+        arg, = unpack_form('atom?', args, 1)
+        self.emit(CONST, self.constant(arg.__class__ in (Number, Symbol)))
+
+
+_special_forms = {
+    builtins.define: _Assembler.compile_define,
+    builtins.func: _Assembler.compile_func,
+    builtins.cond: _Assembler.compile_cond,
+    builtins.atom: _Assembler.compile_atom,
+}
+
+
+_arithmetic_ops = {
+    builtins.add: ADD,
+    builtins.minus: SUB,
+    builtins.mult: MUL,
+    builtins.div: DIV,
+}
@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+
+from lispy.aio import AsyncInterpreter, BudgetExceeded
+from lispy.parser import Number
+
+
+COUNT = ('(define count (func (n) (cond ((eq? n 0) 0)'
+         ' (default (count (- n 1))))))')
+
+
+def test_interpret_async():
+    interpreter = AsyncInterpreter(slice_reductions=10)
+    interpreter.interpret(COUNT)
+    value = asyncio.run(interpreter.interpret_async('(count 1000)'))
+    assert value == Number(0)
+    assert interpreter.interpret('(+ 1 2)') == Number(3)
+
+
+def test_interleaving():
+    interpreter = AsyncInterpreter(slice_reductions=100)
+    interpreter.interpret(COUNT)
+    ticks = []
+
+    async def ticker():
+        for _ in range(5):
+            ticks.append(True)
+            await asyncio.sleep(0)
+
+    async def main():
+        tick_task = asyncio.create_task(ticker())
+        values = await asyncio.gather(
+            interpreter.interpret_async('(count 5000)'),
+            interpreter.interpret_async('(+ 1 (count 3000))'))
+        await tick_task
+        return values
+
+    assert asyncio.run(main()) == [Number(0), Number(1)]
+    assert len(ticks) == 5
+
+
+def test_budget_exceeded():
+    interpreter = AsyncInterpreter(slice_reductions=100)
+    interpreter.interpret(COUNT)
+    with pytest.raises(BudgetExceeded):
+        asyncio.run(interpreter.interpret_async('(count 1000)',
+                                                max_reductions=500))
+    value = asyncio.run(interpreter.interpret_async('(count 100)',
+                                                    max_reductions=500))
+    assert value == Number(0)
+
+
+def test_timeout():
+    interpreter = AsyncInterpreter()
+    interpreter.interpret('(define loop (func () (loop)))')
+    with pytest.raises(TimeoutError):
+        asyncio.run(interpreter.interpret_async('(loop)', timeout=0.05))
+
+
+def test_cancel():
+    interpreter = AsyncInterpreter()
+    interpreter.interpret('(define loop (func () (loop)))')
+
+    async def main():
+        task = asyncio.create_task(interpreter.interpret_async('(loop)'))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
@@ -0,0 +1,42 @@
+import json
+
+from lispy.bench.__main__ import main
+from lispy.bench.suite import Workload, run, compare
+
+
+def _workload(name):
+    return Workload(name, 'test', lambda: (lambda: sum(range(100)), 100),
+                    True)
+
+
+def test_run_report():
+    report = run([_workload('a'), _workload('b')], repeat=2)
+    assert set(report['results']) == {'a', 'b'}
+    result = report['results']['a']
+    assert result['ops'] == 100
+    assert result['ops_per_sec'] > 0
+    assert result['peak_bytes'] >= 0
+    assert report['phases']['test'] > 0
+    json.dumps(report)
+
+
+def _report(**ops_per_sec):
+    return {'results': {name: {'ops_per_sec': value}
+                        for name, value in ops_per_sec.items()}}
+
+
+def test_compare():
+    comparisons = compare(_report(a=100, b=100, c=1),
+                          _report(a=95, b=50, d=1), threshold=0.1)
+    assert [(c.name, c.ratio, c.regressed) for c in comparisons] == [
+        ('a', 0.95, False), ('b', 0.5, True)]
+
+
+def test_compare_exit_status(tmp_path):
+    baseline = tmp_path / 'baseline.json'
+    current = tmp_path / 'current.json'
+    baseline.write_text(json.dumps(_report(a=100)))
+    current.write_text(json.dumps(_report(a=80)))
+    assert main(['compare', str(baseline), str(current)]) == 1
+    assert main(['compare', str(baseline), str(current),
+                 '--threshold', '0.25']) == 0
@@ -3,7 +3,9 @@ import pytest
 from lispy.parser import Number, List, Quotation, Symbol
 from lispy.evaluator import ismacro
 from lispy.builtins import (eq, cons, car, cdr, atom, define, func, cond,
-                            add, minus, mult, div, default)
+                            add, minus, mult, div, floordiv, mod, less,
+                            greater, less_equal, greater_equal, default,
+                            Memoizer)
 
 
 def test_eq():
@@ -100,6 +102,10 @@ def test_add():
 
 def test_minus():
     assert minus([Number(2), Number(1)]) == Number(1)
+    assert minus([Number(2)]) == Number(-2)
+    assert minus([Number(10), Number(1), Number(2)]) == Number(7)
+    with pytest.raises(TypeError):
+        minus([])
 
 
 def test_mult():
@@ -111,3 +117,86 @@ def test_mult():
 
 def test_div():
     assert div([Number(6), Number(3)]) == Number(2)
+    assert div([Number(4)]) == Number(0.25)
+    assert div([Number(12), Number(3), Number(2)]) == Number(2)
+    with pytest.raises(TypeError):
+        div([])
+
+
+def test_floordiv_mod():
+    assert floordiv([Number(7), Number(2)]) == Number(3)
+    assert floordiv([Number(-7), Number(2)]) == Number(-4)
+    assert mod([Number(7), Number(2)]) == Number(1)
+    assert mod([Number(-7), Number(2)]) == Number(1)
+
+
+def test_comparisons():
+    one, two, three = Number(1), Number(2), Number(3)
+    assert less([one, two, three])
+    assert not less([one, three, two])
+    assert not less([one, one])
+    assert less_equal([one, one, two])
+    assert greater([three, two, one])
+    assert not greater([three, three])
+    assert greater_equal([three, three, one])
+    assert less([one])
+
+
+def test_cons_shares_tail():
+    tail = List([Number(2), Number(3)])
+    list_ = cons([Number(1), tail])
+    assert cdr([list_]) is tail
+    assert str(list_) == '(1 2 3)'
+
+
+def test_cdr_empty():
+    assert cdr([List([])]) == List([])
+
+
+def test_long_list():
+    list_ = List([])
+    for i in range(100000):
+        list_ = cons([Number(i), list_])
+    assert list_ == List([Number(i) for i in reversed(range(100000))])
+    for _ in range(100000):
+        list_ = cdr([list_])
+    assert list_.is_empty
+
+
+def test_cons_non_list():
+    with pytest.raises(TypeError):
+        cons([Number(1), Number(2)])
+
+
+def test_memoize():
+    calls = []
+
+    def square(args):
+        calls.append(args)
+        return Number(args[0].value ** 2)
+
+    memoizer = Memoizer(2)
+    memoized = memoizer([square])
+    assert memoized([Number(3)]) == Number(9)
+    assert memoized([Number(3)]) == Number(9)
+    assert len(calls) == 1
+    assert memoizer.stats == (1, 1, 0)
+
+    memoized([Number(4)])
+    memoized([Number(5)])
+    assert memoizer.stats == (1, 3, 1)
+    memoized([Number(3)])
+    assert len(calls) == 4
+
+
+def test_memoize_list_args():
+    memoizer = Memoizer()
+    memoized = memoizer([car])
+    assert memoized([List([Number(1), Number(2)])]) == Number(1)
+    assert memoized([List([Number(1), Number(2)])]) == Number(1)
+    assert memoizer.stats.hits == 1
+
+
+def test_list_hash():
+    assert hash(List([Number(1), List([])])) == hash(List([Number(1),
+                                                           List([])]))
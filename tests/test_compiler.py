@@ -0,0 +1,101 @@
+import pytest
+
+from lispy.compiler import compile_ast
+from lispy.interpreter import Interpreter
+from lispy.lexer import tokenize
+from lispy.parser import parse, List, Number
+
+
+def compile_source(source, vars_):
+    return compile_ast(parse(tokenize(source)), vars_)
+
+
+programs = [
+    ['(+ 1 (* 2 3) (- 9 4))'],
+    ["(cons 1 (cdr '(1 2 3)))"],
+    ['(define fact (func (n) (cond ((eq? n 0) 1)'
+     '                             (default (* n (fact (- n 1)))))))',
+     '(fact 10)'],
+    ['(define compose (func (f g) (func (x) (f (g x)))))',
+     '(define inc (func (x) (+ x 1)))',
+     '(define double (func (x) (* x 2)))',
+     '((compose inc double) 5)'],
+    ['(define k (func (cond) (cond)))',
+     '(k (func () 7))'],
+    ["(atom? 'x)", '(atom? 1)'],
+    ['(define adder (func (a) (func (b) (func (c) (+ a b c)))))',
+     '(((adder 1) 2) 3)'],
+    ['(define x 10)',
+     '(define f (func (n) (cond ((eq? n 0) x)'
+     '                          (default ((func () (define x n)))))))',
+     '(f 0)',
+     '(f 5)',
+     'x'],
+    ['(define g (func (y) (cond ((eq? y 0) (define z 1))'
+     '                          (default z))))',
+     '(define z 42)',
+     '(g 1)'],
+    ['(define x 100)',
+     '(define outer (func (x) (func (y) (cond ((eq? y 0) x)'
+     '                                        (default (define x 5))))))',
+     '((outer 7) 0)',
+     '((outer 7) 1)'],
+]
+
+
+def test_same_as_tree():
+    for program in programs:
+        closure = Interpreter()
+        tree = Interpreter(backend='tree')
+        for expr in program:
+            assert closure.interpret(expr) == tree.interpret(expr), expr
+
+
+def test_factorial():
+    interpreter = Interpreter()
+    interpreter.interpret('(define fact (func (n) (cond ((eq? n 0) 1)'
+                          '  (default (* n (fact (- n 1)))))))')
+    assert interpreter.interpret('(fact 5)') == Number(120)
+
+
+def test_arity_checked_at_compile_time():
+    vars_ = Interpreter().vars_
+    for source in ['(define x)', '(define x 1 2)', '(define 1 2)',
+                   '(func (x))', '(func (1) x)', '(cond (x))',
+                   '(atom? 1 2)']:
+        with pytest.raises(SyntaxError):
+            compile_source(source, vars_)
+
+
+def test_other_macro():
+    def quote_args(vars_, args):
+        return List(args.elements)
+    quote_args._is_macro = True
+
+    vars_ = {'quote-args': quote_args}
+    code = compile_source('(quote-args x (y))', vars_)
+    assert str(code(vars_)) == '(x (y))'
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        Interpreter(backend='jit')
+
+
+def test_arity_checked_at_call_time():
+    interpreter = Interpreter()
+    interpreter.interpret('(define f (func (a b) a))')
+    with pytest.raises(TypeError):
+        interpreter.interpret('(f 1)')
+
+
+def test_macro_in_function_scope():
+    def env_of(vars_, args):
+        symbol, = args
+        return vars_[symbol.identifier]
+    env_of._is_macro = True
+
+    interpreter = Interpreter()
+    interpreter.vars_['env-of'] = env_of
+    interpreter.interpret('(define f (func (a) (func (b) (env-of a))))')
+    assert interpreter.interpret('((f 3) 4)') == Number(3)
@@ -1,7 +1,8 @@
 from functools import reduce
 
+from lispy.interpreter import Interpreter
 from lispy.parser import List, Quotation, Number, Symbol
-from lispy.evaluator import evaluate, macro, ismacro
+from lispy.evaluator import evaluate, macro, ismacro, Lambda
 
 
 def test_number():
@@ -77,3 +78,17 @@ def test_macro_evaluation():
 
     evaluate(List([Symbol('define'), Symbol('list'), ast]), vars_)
     assert vars_['list'] == ast
+
+
+def test_tail_call():
+    interpreter = Interpreter(backend='tree')
+    interpreter.interpret('(define loop (func (n)'
+                          '  (cond ((eq? n 0) 0)'
+                          '        (default (loop (- n 1))))))')
+    assert interpreter.interpret('(loop 20000)') == Number(0)
+
+
+def test_lambda():
+    square = Lambda(['x'], List([Symbol('*'), Symbol('x'), Symbol('x')]),
+                    {'*': lambda args: Number(args[0].value * args[1].value)})
+    assert square([Number(3)]) == Number(9)
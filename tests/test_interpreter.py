@@ -1,3 +1,5 @@
+import pytest
+
 from lispy.interpreter import Interpreter
 from lispy.parser import List, Number
 
@@ -93,3 +95,160 @@ def test_mult():
 def test_div():
     interpreter = Interpreter()
     assert interpreter.interpret('(/ 6 3)') == Number(2)
+    assert interpreter.interpret('(/ 2)') == Number(0.5)
+    assert interpreter.interpret('(/ 24 2 3)') == Number(4)
+
+
+def test_variadic_minus():
+    interpreter = Interpreter()
+    assert interpreter.interpret('(- 5)') == Number(-5)
+    assert interpreter.interpret('(- 10 1 2 3)') == Number(4)
+
+
+def test_integer_division():
+    interpreter = Interpreter()
+    assert interpreter.interpret('(// 7 2)') == Number(3)
+    assert interpreter.interpret('(mod 7 2)') == Number(1)
+
+
+def test_comparisons():
+    interpreter = Interpreter()
+    assert interpreter.interpret('(< 1 2 3)')
+    assert not interpreter.interpret('(< 1 3 2)')
+    assert interpreter.interpret('(<= 2 2)')
+    assert interpreter.interpret('(> 3 2)')
+    assert not interpreter.interpret('(>= 1 2)')
+    interpreter.interpret('(define count (func (n) (cond ((< n 1) 0)'
+                          ' (default (+ 1 (count (- n 1)))))))')
+    assert interpreter.interpret('(count 10)') == Number(10)
+
+
+def test_vectors():
+    interpreter = Interpreter()
+    interpreter.interpret('(define v (vector 1 2 3))')
+    assert str(interpreter.interpret('v')) == '#(1.0 2.0 3.0)'
+    assert interpreter.interpret('(vref v 2)') == Number(3)
+    assert interpreter.interpret('(vlen v)') == Number(3)
+    assert str(interpreter.interpret('(vmap+ v v)')) == '#(2.0 4.0 6.0)'
+    assert str(interpreter.interpret('(v* v 2)')) == '#(2.0 4.0 6.0)'
+    assert interpreter.interpret('(vsum v)') == Number(6)
+    assert interpreter.interpret('(vdot v v)') == Number(14)
+    assert str(interpreter.interpret('(vslice v 1)')) == '#(2.0 3.0)'
+    assert str(interpreter.interpret('(vslice v 0 1)')) == '#(1.0)'
+    assert str(interpreter.interpret("(vector '(4 5))")) == '#(4.0 5.0)'
+
+
+def test_tail_recursion():
+    interpreter = Interpreter()
+    interpreter.interpret('(define loop (func (n acc)'
+                          '  (cond ((eq? n 0) acc)'
+                          '        (default (loop (- n 1) (+ acc 1))))))')
+    assert interpreter.interpret('(loop 1000000 0)') == Number(1000000)
+
+
+def test_memoize():
+    interpreter = Interpreter()
+    interpreter.interpret('(define fib (memoize (func (n)'
+                          '  (cond ((eq? n 0) 0)'
+                          '        ((eq? n 1) 1)'
+                          '        (default (+ (fib (- n 1))'
+                          '                    (fib (- n 2))))))))')
+    assert interpreter.interpret('(fib 90)') == Number(2880067194370816120)
+    assert interpreter.memo_stats.misses == 91
+    assert interpreter.memo_stats.hits == 88
+
+    interpreter.interpret('(define f (memoize (func (x) (car x)) 1))')
+    interpreter.interpret("(f '(1 2))")
+    interpreter.interpret("(f '(3 4))")
+    assert interpreter.memo_stats.evictions == 1
+
+    interpreter.interpret('(define g (memoize (func (x) (// x 1))))')
+    assert interpreter.interpret('(g 2)').value.__class__ is int
+    assert interpreter.interpret('(g (/ 4 2))').value.__class__ is float
+
+
+def test_parse_cache():
+    interpreter = Interpreter(cache_size=2)
+    interpreter.interpret('(define x 1)')
+    assert interpreter.interpret('(+ x 1)') == Number(2)
+    interpreter.interpret('(define x 5)')
+    assert interpreter.interpret('(+ x 1)') == Number(6)
+
+    stats = interpreter.cache_stats
+    assert (stats.hits, stats.misses, stats.evictions) == (1, 3, 1)
+    assert stats.size == 2
+    assert stats.bytes > 0
+
+    interpreter.clear_cache()
+    assert interpreter.cache_stats.size == 0
+    assert interpreter.cache_stats.bytes == 0
+
+
+def test_parse_cache_disabled():
+    interpreter = Interpreter(cache_size=0)
+    interpreter.interpret('(+ 1 1)')
+    interpreter.interpret('(+ 1 1)')
+    assert interpreter.cache_stats == (0, 0, 0, 0, 0)
+
+
+REBINDINGS = [
+    '(+ 2 3)',
+    '(define + (func (a b) a))',
+    '(+ 2 3)',
+    '(define x 1)',
+    '(define define (func (a b) 99))',
+    '(define x 1)',
+]
+
+
+def test_parse_cache_rebinding():
+    cached = Interpreter()
+    uncached = Interpreter(cache_size=0)
+    for expr in REBINDINGS:
+        assert cached.interpret(expr) == uncached.interpret(expr), expr
+    assert cached.interpret('(+ 2 3)') == Number(2)
+    assert cached.interpret('(define x 1)') == Number(99)
+
+
+PROGRAM = '''
+(define square (func (x) (* x x)))
+(square 3)
+(define y (square 4))
+(+ y 1)
+'''
+
+
+def test_interpret_many():
+    interpreter = Interpreter()
+    values = interpreter.interpret_many(PROGRAM)
+    assert next(values) is None
+    assert next(values) == Number(9)
+    assert 'y' not in interpreter.vars_
+    assert list(values) == [None, Number(17)]
+
+
+def test_syntax_error_position():
+    interpreter = Interpreter()
+    with pytest.raises(SyntaxError, match='line 1, column 6'):
+        interpreter.interpret('(+ 1 (2 3')
+    values = interpreter.interpret_many('(define x 1)\n(+ x\n  )) x')
+    assert next(values) is None
+    assert next(values) == Number(1)
+    with pytest.raises(SyntaxError, match='line 3, column 4'):
+        next(values)
+
+
+def test_interpret_file(tmp_path):
+    path = tmp_path / 'program.lispy'
+    path.write_text(PROGRAM)
+    interpreter = Interpreter()
+    values = list(interpreter.interpret_file(str(path), chunk_size=7))
+    assert values == [None, Number(9), None, Number(17)]
+
+    with open(path) as stream:
+        values = list(Interpreter().interpret_file(stream))
+    assert values == [None, Number(9), None, Number(17)]
+
+    path.write_text('(define x 1)\n(+ x 2))')
+    with pytest.raises(SyntaxError, match='offset 20'):
+        list(Interpreter().interpret_file(str(path), chunk_size=5))
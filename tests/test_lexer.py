@@ -1,3 +1,8 @@
+import io
+from array import array
+
+import pytest
+
 from lispy import lexer
 
 
@@ -67,3 +72,60 @@ def test_nested_list():
                       (lexer.number, '22'),
                       (lexer.close_parenthesis, ')'),
                       (lexer.close_parenthesis, ')')]
+
+
+def test_maximal_munch():
+    tokens = list(lexer.tokenize('(abc123 123abc)'))
+    assert tokens == [(lexer.open_parenthesis, '('),
+                      (lexer.symbol, 'abc123'),
+                      (lexer.number, '123'),
+                      (lexer.symbol, 'abc'),
+                      (lexer.close_parenthesis, ')')]
+
+
+def test_invalid_char():
+    with pytest.raises(ValueError, match='line 2, column 3'):
+        list(lexer.tokenize('(abc\n  %)'))
+
+
+def test_stream_chunks():
+    code = "(define square (func (x) (* x x)))\n(cons 12 '(345 abc))"
+    expected = list(lexer.tokenize(code))
+    for chunk_size in range(1, len(code) + 1):
+        stream = io.StringIO(code)
+        tokens = list(lexer.tokenize_stream(stream, chunk_size=chunk_size))
+        assert tokens == expected
+
+
+def test_stream_iterable():
+    tokens = list(lexer.tokenize_stream(['(ab', 'c 1', '2', '3)']))
+    assert tokens == [(lexer.open_parenthesis, '('),
+                      (lexer.symbol, 'abc'),
+                      (lexer.number, '123'),
+                      (lexer.close_parenthesis, ')')]
+
+
+def test_stream_invalid_char():
+    with pytest.raises(ValueError, match='offset 5'):
+        list(lexer.tokenize_stream(['(abc', ' %)']))
+
+
+def test_offsets():
+    offsets = array('I')
+    tokens = list(lexer.tokenize("(ab\n  '12)", offsets))
+    assert len(tokens) == 5
+    assert list(offsets) == [0, 1, 6, 7, 9]
+
+
+def test_stream_offsets():
+    offsets = array('I')
+    list(lexer.tokenize_stream(['(ab', 'c 1', '2', '3)'], offsets=offsets))
+    assert list(offsets) == [0, 1, 5, 8]
+
+
+def test_line_index():
+    lines = lexer.LineIndex('(a\n  b\n\nc)')
+    assert lines.position(0) == (1, 1)
+    assert lines.position(1) == (1, 2)
+    assert lines.position(5) == (2, 3)
+    assert lines.position(8) == (4, 1)
@@ -1,8 +1,13 @@
+import pickle
+from array import array
+from collections import deque
+
 import pytest
 
 from lispy.lexer import (number, symbol, quote,
-                         open_parenthesis, close_parenthesis)
-from lispy.parser import (parse, List, Quotation, Number, Symbol)
+                         open_parenthesis, close_parenthesis, tokenize)
+from lispy.parser import (parse, parse_all, List, Quotation, Number,
+                          Symbol)
 
 
 def test_empty_list():
@@ -90,3 +95,104 @@ def test_no_close_parenthesis():
                (symbol, '+'),
                (number, '1'),
                (number, '1')])
+
+
+def test_spans():
+    code = "(zip '(11 22) x)"
+    offsets = array('I')
+    ast = parse(tokenize(code, offsets), offsets)
+    assert (ast.offset, ast.end) == (0, len(code))
+    quotation = ast.elements[1]
+    assert code[quotation.offset:quotation.end] == "'(11 22)"
+    assert code[quotation.expr.offset:quotation.expr.end] == '(11 22)'
+
+
+def test_quote_word_span():
+    offsets = array('I')
+    ast = parse(tokenize("'abc", offsets), offsets)
+    assert (ast.offset, ast.end) == (0, 4)
+
+
+def test_error_offset():
+    offsets = array('I')
+    with pytest.raises(SyntaxError, match='offset 5'):
+        parse(tokenize('(+ 1 (2 3', offsets), offsets)
+
+
+def test_error_position():
+    code = '(+ 1\n   (2 3'
+    offsets = array('I')
+    with pytest.raises(SyntaxError, match='line 2, column 4') as info:
+        parse(tokenize(code, offsets), offsets, code)
+    error = info.value
+    assert (error.lineno, error.offset, error.text) == (2, 4, '   (2 3')
+
+
+def test_parse_all():
+    tokens = tokenize("(define x 1) x '(1 2)")
+    exprs = parse_all(tokens)
+    assert next(exprs) == List([Symbol('define'), Symbol('x'), Number(1)])
+    assert next(exprs) == Symbol('x')
+    assert next(exprs) == Quotation(List([Number(1), Number(2)]))
+    assert list(exprs) == []
+
+
+def test_parse_all_offsets_deque():
+    offsets = deque()
+    exprs = parse_all(tokenize("(define x 1)\n'(1 2)", offsets), offsets)
+    assert next(exprs).offset == 0
+    assert not offsets
+    assert next(exprs).offset == 13
+    assert not offsets
+
+
+def test_symbols_interned():
+    first = parse(tokenize('(f x x)'))
+    second = parse(tokenize('(g x)'))
+    assert first.elements[1] is first.elements[2] is second.elements[1]
+    assert Symbol('x') is second.elements[1]
+
+
+def test_small_numbers_shared():
+    assert Number(7) is Number(7)
+    assert Number(7) == Number(7.0)
+    assert Number(10 ** 6) == Number(10 ** 6)
+    assert Number(1) != Symbol('1')
+
+
+def test_nodes_slotted():
+    ast = parse(tokenize("(f 1000 'x)"))
+    for node in [ast] + ast.elements:
+        assert not hasattr(node, '__dict__')
+
+
+def test_pickle_nodes():
+    ast = parse(tokenize("(f 1 1000 'x (g))"))
+    copy = pickle.loads(pickle.dumps(ast))
+    assert copy == ast
+    assert copy.elements[0] is Symbol('f')
+
+
+def test_deep_nesting():
+    depth = 10000
+    ast = parse(tokenize('(' * depth + 'x' + ')' * depth))
+    for _ in range(depth):
+        ast, = ast
+    assert ast is Symbol('x')
+
+
+def test_chained_quotes():
+    code = "'" * 10000 + '(1)'
+    offsets = array('I')
+    ast = parse(tokenize(code, offsets), offsets)
+    assert (ast.offset, ast.end) == (0, len(code))
+    for _ in range(10000):
+        ast = ast.expr
+    assert ast == List([Number(1)])
+
+
+def test_quote_without_expression():
+    with pytest.raises(SyntaxError):
+        parse(tokenize("(a ')"))
+    with pytest.raises(SyntaxError):
+        parse(tokenize("(a '"))
@@ -0,0 +1,28 @@
+from lispy.lexer import tokenize
+from lispy.parser import parse, Number
+from lispy.pool import InterpreterPool
+
+
+PRELOAD = ['(define square (func (x) (* x x)))']
+
+
+def test_map_ordered():
+    exprs = ['(square {})'.format(i) for i in range(20)]
+    with InterpreterPool(2, preload=PRELOAD) as pool:
+        values = list(pool.map(exprs, chunksize=3))
+    assert values == [Number(i * i) for i in range(20)]
+
+
+def test_map_unordered():
+    exprs = ['(square {})'.format(i) for i in range(20)]
+    with InterpreterPool(2, preload=PRELOAD) as pool:
+        pairs = list(pool.map_unordered(exprs, chunksize=4))
+    assert sorted(pairs) == [(i, Number(i * i)) for i in range(20)]
+
+
+def test_parsed_exprs():
+    asts = [parse(tokenize("(cons {} '(1 2))".format(i))) for i in range(5)]
+    with InterpreterPool(2, backend='vm') as pool:
+        values = list(pool.map(asts))
+    assert [str(value) for value in values] == [
+        '({} 1 2)'.format(i) for i in range(5)]
@@ -0,0 +1,100 @@
+import pstats
+
+import pytest
+
+from lispy.interpreter import Interpreter
+from lispy.parser import Number
+from lispy.profiler import Profiler
+
+
+FIB = ('(define fib (func (n) (cond ((< n 2) n)'
+       ' (default (+ (fib (- n 1)) (fib (- n 2)))))))')
+
+
+def _profiled():
+    interpreter = Interpreter(profile=True)
+    interpreter.interpret(FIB)
+    interpreter.interpret(
+        '(define main (func () (+ (fib 5) ((func (x) x) 1))))')
+    return interpreter
+
+
+def test_call_counts():
+    interpreter = _profiled()
+    assert interpreter.interpret('(main)') == Number(6)
+    functions = interpreter.profiler.functions
+    assert functions['main'][:2] == [1, 1]
+    assert functions['fib'][:2] == [1, 15]
+    assert functions['<func>'][:2] == [1, 1]
+    edges = interpreter.profiler.edges
+    assert edges[None, 'main'][1] == 1
+    assert edges['main', 'fib'][1] == 1
+    assert edges['fib', 'fib'][:2] == [0, 14]
+
+
+def test_times():
+    interpreter = _profiled()
+    interpreter.interpret('(main)')
+    primitive, calls, exclusive, inclusive = (
+        interpreter.profiler.functions['main'])
+    fib_inclusive = interpreter.profiler.functions['fib'][3]
+    assert 0 < exclusive < inclusive
+    assert inclusive >= exclusive + fib_inclusive
+
+
+def test_tail_calls_replace_frame():
+    interpreter = Interpreter(profile=True)
+    interpreter.interpret('(define loop (func (n) (cond ((eq? n 0) 0)'
+                          ' (default (loop (- n 1))))))')
+    interpreter.interpret('(define main (func () (loop 100000)))')
+    interpreter.interpret('(main)')
+    assert interpreter.profiler.functions['loop'][:2] == [100001, 100001]
+    assert interpreter.profiler.edges[None, 'loop'][1] == 100001
+    assert ('main', 'loop') not in interpreter.profiler.edges
+
+
+def test_enabled():
+    interpreter = _profiled()
+    profiler = interpreter.profiler
+    profiler.enabled = False
+    interpreter.interpret('(main)')
+    assert profiler.functions == {}
+    with profiler:
+        interpreter.interpret('(fib 3)')
+    interpreter.interpret('(fib 3)')
+    assert profiler.functions['fib'][1] == 5
+
+
+def test_pstats(tmp_path):
+    interpreter = _profiled()
+    interpreter.interpret('(main)')
+    stats = pstats.Stats(interpreter.profiler)
+    assert stats.total_calls == 17
+    path = tmp_path / 'lispy.prof'
+    interpreter.profiler.dump_stats(path)
+    assert pstats.Stats(str(path)).stats == stats.stats
+
+
+def test_collapsed_stacks():
+    interpreter = _profiled()
+    interpreter.interpret('(main)')
+    paths = [line.rsplit(' ', 1)[0]
+             for line in interpreter.profiler.collapsed_stacks()]
+    assert 'main;fib;fib' in paths
+    assert all(path.startswith('main') for path in paths)
+
+
+def test_not_profiled_by_default():
+    interpreter = Interpreter()
+    assert interpreter.profiler is None
+    with pytest.raises(ValueError):
+        Interpreter(backend='vm', profile=True)
+
+
+def test_profiler_reset():
+    interpreter = _profiled()
+    interpreter.interpret('(main)')
+    interpreter.profiler.reset()
+    assert interpreter.profiler.functions == {}
+    assert interpreter.profiler.collapsed_stacks() == []
+    assert isinstance(interpreter.profiler, Profiler)
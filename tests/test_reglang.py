@@ -1,7 +1,10 @@
 from itertools import product, starmap
 
-from lispy.reglang import (Empty, Single, Union, Con, KleeneStar,
-                           union_char, char_range, string, plus)
+import pytest
+
+from lispy.reglang import (Empty, Single, Union, Con, KleeneStar, REJECT,
+                           union_char, char_range, string, plus,
+                           tagged_dfa, equivalence_classes, LazyDFA)
 
 
 class TestEmpty:
@@ -245,3 +248,156 @@ class TestPlus:
         for char in half_string:
             state = self.fa.next(state, char)
             assert not state.is_final
+
+
+def fa_accepts(fa, string):
+    state = fa.start_state
+    for char in string:
+        state = fa.next(state, char)
+        if state is None:
+            return False
+    return state.is_final
+
+
+def words(alphabet, max_length):
+    for length in range(max_length + 1):
+        for chars in product(alphabet, repeat=length):
+            yield ''.join(chars)
+
+
+dfa_cases = [
+    (Empty(), 'x', 2),
+    (Single('x'), 'xy', 3),
+    (Union(Single('x'), Single('y')), 'xyz', 3),
+    (Con(Single('x'), Single('y')), 'xyz', 3),
+    (Con(union_char('xy'), union_char('ab')), 'xyab', 3),
+    (KleeneStar(string('abc')), 'abcx', 7),
+    (union_char('abcde'), 'aex', 2),
+    (char_range('a', 'z'), 'azA', 2),
+    (string('abcde'), 'abcdex', 6),
+    (plus(string('abc')), 'abc', 7),
+]
+
+
+def test_dfa_same_language():
+    for fa, alphabet, max_length in dfa_cases:
+        dfa = fa.to_dfa()
+        for word in words(alphabet, max_length):
+            assert dfa.accepts(word) == fa_accepts(fa, word), word
+
+
+def test_dfa_next():
+    dfa = string('ab').to_dfa()
+    state = dfa.next(dfa.start_state, 'a')
+    assert not dfa.is_final(state)
+    assert dfa.is_final(dfa.next(state, 'b'))
+    assert dfa.next(state, 'a') is None
+    assert dfa.next(state, 'x') is None
+
+
+def test_dfa_table():
+    dfa = char_range('a', 'z').to_dfa()
+    assert dfa.width == 1
+    assert len(dfa.table) == dfa.state_count * dfa.width
+    assert dfa.columns['q'] == 0
+    assert 'A' not in dfa.columns
+
+
+def test_equivalence_classes():
+    assert equivalence_classes(char_range('a', 'e')) == ['abcde']
+    assert equivalence_classes(string('abc')) == ['a', 'b', 'c']
+    fa = Con(union_char('abc'), KleeneStar(Union(char_range('a', 'd'),
+                                                 Single('x'))))
+    assert equivalence_classes(fa) == ['abc', 'dx']
+    assert equivalence_classes(Empty()) == []
+
+
+def test_unicode_classes():
+    fa = plus(char_range('\u0400', '\u04ff'))
+    dfa = fa.to_dfa(minimize=True)
+    assert dfa.width == 1
+    assert dfa.accepts('\u043b\u0438\u0441\u043f')
+    assert not dfa.accepts('lisp')
+
+
+def test_minimized_dfa_same_language():
+    for fa, alphabet, max_length in dfa_cases:
+        dfa = fa.to_dfa()
+        minimized = dfa.minimize()
+        assert minimized.state_count <= dfa.state_count
+        for word in words(alphabet, max_length):
+            assert minimized.accepts(word) == dfa.accepts(word), word
+
+
+def test_minimized_dfa_size():
+    assert char_range('a', 'z').to_dfa(minimize=True).state_count == 2
+    assert KleeneStar(string('abc')).to_dfa(minimize=True).state_count == 3
+    assert plus(string('abc')).to_dfa(minimize=True).state_count == 4
+    assert Empty().to_dfa(minimize=True).state_count == 1
+
+
+def test_tagged_dfa_priority():
+    dfa = tagged_dfa(string('if'), plus(char_range('a', 'z')),
+                     minimize=True)
+    state = dfa.start_state
+    for char in 'if':
+        state = dfa.next(state, char)
+    assert dfa.tags[state] == 0
+    assert dfa.tags[dfa.next(state, 'x')] == 1
+    assert dfa.tags[dfa.next(dfa.start_state, 'i')] == 1
+    assert dfa.tags[dfa.start_state] == REJECT
+
+
+def test_lazy_dfa_same_language():
+    for fa, alphabet, max_length in dfa_cases:
+        dfa = fa.to_dfa()
+        lazy = fa.to_lazy_dfa()
+        for word in words(alphabet, max_length):
+            assert lazy.accepts(word) == dfa.accepts(word), word
+        assert lazy.state_count <= dfa.state_count
+
+
+def test_lazy_dfa_next():
+    dfa = LazyDFA(string('ab'))
+    assert dfa.state_count == 1
+    state = dfa.next(dfa.start_state, 'a')
+    assert not dfa.is_final(state)
+    assert dfa.is_final(dfa.next(state, 'b'))
+    assert dfa.next(state, 'a') is None
+    assert dfa.next(state, 'x') is None
+
+
+def test_lazy_dfa_bounded():
+    ab = union_char('ab')
+    # The nth letter from the end is an 'a': the full DFA has 2 ** 10 states
+    fa = Con(KleeneStar(ab), Single('a'), *[ab] * 9)
+    for max_states in [3, 16]:
+        lazy = LazyDFA(fa, max_states=max_states)
+        for word in words('ab', 12):
+            assert lazy.accepts(word) == fa_accepts(fa, word), word
+            assert lazy.state_count <= max_states
+        assert lazy.flushes > 0
+
+    with pytest.raises(ValueError):
+        LazyDFA(fa, max_states=2)
+
+
+def test_lazy_dfa_tags():
+    dfa = LazyDFA(string('if'), plus(char_range('a', 'z')))
+    state = dfa.next(dfa.next(dfa.start_state, 'i'), 'f')
+    assert dfa.tags[state] == 0
+    assert dfa.tags[dfa.next(state, 'x')] == 1
+
+
+def test_tagged_dfa_single_chars():
+    for dfa in [tagged_dfa(Single('a'), Single('b')),
+                LazyDFA(Single('a'), Single('b'))]:
+        assert dfa.tags[dfa.next(dfa.start_state, 'a')] == 0
+        assert dfa.tags[dfa.next(dfa.start_state, 'b')] == 1
+
+    halves = [char_range('a', 'm'), char_range('n', 'z')]
+    assert equivalence_classes(*halves) == ['abcdefghijklm',
+                                            'nopqrstuvwxyz']
+    for dfa in [tagged_dfa(*halves, minimize=True), LazyDFA(*halves)]:
+        assert dfa.tags[dfa.next(dfa.start_state, 'c')] == 0
+        assert dfa.tags[dfa.next(dfa.start_state, 'n')] == 1
@@ -0,0 +1,46 @@
+from lispy import lexer, tables
+
+
+def test_round_trip(tmp_path):
+    dfa = lexer.build_dfa()
+    path = tmp_path / 'lexer.tables'
+    tables.dump(dfa, path)
+    loaded = tables.load(path)
+    assert loaded.alphabet == dfa.alphabet
+    assert loaded.table == dfa.table
+    assert loaded.tags == dfa.tags
+
+
+def test_shipped_tables_current():
+    dfa = tables.load()
+    assert dfa is not None
+    assert dfa.table == lexer.build_dfa().table
+
+
+def test_missing():
+    assert tables.load('/nonexistent/lexer.tables') is None
+
+
+def test_stale(tmp_path, monkeypatch):
+    path = tmp_path / 'lexer.tables'
+    tables.dump(lexer.build_dfa(), path)
+    monkeypatch.setattr(tables, 'fingerprint', lambda: b'\0' * 32)
+    assert tables.load(path) is None
+
+
+def test_truncated(tmp_path):
+    path = tmp_path / 'lexer.tables'
+    tables.dump(lexer.build_dfa(), path)
+    path.write_bytes(path.read_bytes()[:-1])
+    assert tables.load(path) is None
+    path.write_bytes(b'LISPY')
+    assert tables.load(path) is None
+
+
+def test_token_class_fa_built_lazily():
+    calls = []
+    token_cls = lexer.TokenClass('x', lambda: calls.append(1) or 'fa')
+    assert calls == []
+    assert token_cls.fa == 'fa'
+    assert token_cls.fa == 'fa'
+    assert calls == [1]
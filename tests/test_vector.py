@@ -0,0 +1,57 @@
+import pickle
+
+import pytest
+
+from lispy.evaluator import evaluate
+from lispy.compiler import compile_ast
+from lispy.vector import Vector
+
+
+def test_elements():
+    vector = Vector([1, 2.5, 3])
+    assert len(vector) == 3
+    assert vector[1] == 2.5
+    assert list(vector) == [1.0, 2.5, 3.0]
+    assert str(vector) == '#(1.0 2.5 3.0)'
+
+
+def test_elementwise():
+    a = Vector([1, 2, 3])
+    b = Vector([4, 5, 6])
+    assert a.add(b) == Vector([5, 7, 9])
+    assert a.mul(b) == Vector([4, 10, 18])
+    assert a.add(1) == Vector([2, 3, 4])
+    assert a.mul(0.5) == Vector([0.5, 1, 1.5])
+    assert a == Vector([1, 2, 3])
+
+
+def test_reductions():
+    a = Vector(range(1000))
+    assert a.sum() == sum(range(1000))
+    assert a.dot(a) == sum(i * i for i in range(1000))
+    assert Vector().sum() == 0
+
+
+def test_length_mismatch():
+    with pytest.raises(ValueError):
+        Vector([1, 2]).add(Vector([1]))
+    with pytest.raises(ValueError):
+        Vector([1, 2]).dot(Vector([1]))
+
+
+def test_slice():
+    a = Vector(range(10))
+    assert a.slice(2, 5) == Vector([2, 3, 4])
+    assert a.slice(8) == Vector([8, 9])
+    assert a == Vector(range(10))
+
+
+def test_self_evaluating():
+    vector = Vector([1, 2])
+    assert evaluate(vector, {}) is vector
+    assert compile_ast(vector, {})({}) is vector
+
+
+def test_pickle():
+    vector = Vector([1, 2, 3])
+    assert pickle.loads(pickle.dumps(vector)) == vector
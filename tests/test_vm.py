@@ -0,0 +1,80 @@
+import inspect
+from functools import partial
+
+import pytest
+
+from tests import test_interpreter
+from tests.test_compiler import programs
+from lispy.interpreter import Interpreter
+from lispy.lexer import tokenize
+from lispy.parser import parse, Number
+from lispy.vm import compile_ast, disassemble, execute, Function
+
+
+interpreter_tests = [func for name, func
+                     in inspect.getmembers(test_interpreter,
+                                           inspect.isfunction)
+                     if name.startswith('test_')]
+
+
+@pytest.mark.parametrize('test', interpreter_tests)
+def test_interpreter_suite(test, monkeypatch, request):
+    monkeypatch.setattr(test_interpreter, 'Interpreter',
+                        partial(Interpreter, backend='vm'))
+    fixtures = [request.getfixturevalue(name)
+                for name in inspect.signature(test).parameters]
+    test(*fixtures)
+
+
+def test_deep_recursion():
+    interpreter = Interpreter(backend='vm')
+    interpreter.interpret('(define sum (func (n) (cond ((eq? n 0) 0)'
+                          '  (default (+ n (sum (- n 1)))))))')
+    assert interpreter.interpret('(sum 20000)') == Number(200010000)
+
+
+def test_tail_call():
+    interpreter = Interpreter(backend='vm')
+    interpreter.interpret('(define loop (func (n acc) (cond ((eq? n 0) acc)'
+                          '  (default (loop (- n 1) (+ acc 1))))))')
+    assert interpreter.interpret('(loop 50000 0)') == Number(50000)
+
+
+def test_call_from_python():
+    interpreter = Interpreter(backend='vm')
+    square = interpreter.interpret('(func (x) (* x x))')
+    assert isinstance(square, Function)
+    assert square([Number(7)]) == Number(49)
+
+
+def test_disassemble():
+    vars_ = Interpreter().vars_
+    code = compile_ast(parse(tokenize('(define inc (func (x) (+ x 1)))')),
+                       vars_)
+    listing = disassemble(code)
+    assert 'MAKE_FUNC' in listing
+    assert 'STORE' in listing and '(inc)' in listing
+    assert 'inc (x):' in listing
+    assert 'ADD' in listing
+
+    execute(code, vars_)
+    assert vars_['inc']([Number(1)]) == Number(2)
+
+
+def test_arithmetic_rebinding():
+    interpreter = Interpreter(backend='vm')
+    interpreter.interpret('(define f (func (x) (+ x 1)))')
+    interpreter.interpret('(define g (func (x) (* x 2 3)))')
+    assert interpreter.interpret('(f 1)') == Number(2)
+    interpreter.interpret('(define + (func (a b) a))')
+    interpreter.interpret('(define * (func (a b c) c))')
+    assert interpreter.interpret('(f 1)') == Number(1)
+    assert interpreter.interpret('(g 1)') == Number(3)
+
+
+def test_same_as_tree():
+    for program in programs:
+        vm = Interpreter(backend='vm')
+        tree = Interpreter(backend='tree')
+        for expr in program:
+            assert vm.interpret(expr) == tree.interpret(expr), expr